@@ -1,7 +1,8 @@
 # Importation des librairies nécessaires
-from py2neo import Graph, Node, Relationship  # Pour gérer Neo4j
+from py2neo import Graph                      # Pour gérer Neo4j
 import random                                # Pour la génération aléatoire
 from datetime import datetime, timedelta     # Pour générer des dates aléatoires
+import itertools                             # Pour découper les lignes en lots
 
 # Connexion à Neo4j (modifie le mot de passe si nécessaire)
 graph = Graph("bolt://localhost:7687", auth=("neo4j", "12345678"))
@@ -21,6 +22,58 @@ def random_date(start_year=2020, end_year=2024):
     # On ajoute les jours aléatoires à la date de départ et formate au format YYYY-MM-DD
     return (start + timedelta(days=random_days)).strftime("%Y-%m-%d")
 
+# ---------------------------------------------------------------
+# Écriture par lots : UNWIND $rows + MERGE, une requête par lot
+# ---------------------------------------------------------------
+# Nombre de lignes envoyées par requête Cypher
+TAILLE_LOT = 5000
+
+# Clés uniques : les MERGE s'appuient sur l'index créé par la contrainte
+CONTRAINTES = [("Region", "id_region"), ("Etablissement", "id_etablissement"), ("Eleve", "id_eleve")]
+
+def creer_contraintes():
+    # Une contrainte d'unicité par label (sans effet si elle existe déjà)
+    for label, cle in CONTRAINTES:
+        graph.run(f"CREATE CONSTRAINT {label.lower()}_{cle} IF NOT EXISTS "
+                  f"FOR (n:{label}) REQUIRE n.{cle} IS UNIQUE")
+
+def ecrire_par_lots(requete, lignes, taille_lot=TAILLE_LOT):
+    # `lignes` : liste ou générateur de dicts, envoyés par paquets de taille_lot dans $rows
+    lignes = iter(lignes)
+    total = 0
+    while True:
+        lot = list(itertools.islice(lignes, taille_lot))
+        if not lot:
+            return total
+        graph.run(requete, rows=lot)
+        total += len(lot)
+
+# Requêtes d'écriture : le nœud et sa relation sont créés dans la même requête
+REQUETE_REGIONS = """
+UNWIND $rows AS r
+MERGE (n:Region {id_region: r.id_region})
+SET n.nom_region = r.nom_region, n.ville = r.ville
+"""
+
+REQUETE_ETABLISSEMENTS = """
+UNWIND $rows AS r
+MERGE (e:Etablissement {id_etablissement: r.id_etablissement})
+SET e.nom_etablissement = r.nom_etablissement, e.type = r.type, e.statut = r.statut, e.id_region = r.id_region
+WITH e, r
+MATCH (reg:Region {id_region: r.id_region})
+MERGE (e)-[:APPARTIENT_A]->(reg)
+"""
+
+REQUETE_ELEVES = """
+UNWIND $rows AS r
+MERGE (s:Eleve {id_eleve: r.id_eleve})
+SET s.nom = r.nom, s.prenom = r.prenom, s.date_naissance = r.date_naissance,
+    s.sexe = r.sexe, s.id_etablissement = r.id_etablissement
+WITH s, r
+MATCH (e:Etablissement {id_etablissement: r.id_etablissement})
+MERGE (s)-[:INSCRIT_A]->(e)
+"""
+
 # ------------------------------------------
 # 2️⃣ Création des Régions et Villes (zones)
 # ------------------------------------------
@@ -46,15 +99,8 @@ def create_regions():
         {"id_region": "R10", "nom_region": "Kaolack", "ville": "Nioro du Rip"},
     ]
 
-    # Pour chaque région dans la liste
-    for r in regions:
-        # Création du nœud Neo4j avec les propriétés id_region, nom_region et ville
-        node_r = Node("Region",
-                      id_region=r["id_region"],
-                      nom_region=r["nom_region"],
-                      ville=r["ville"])
-        # Fusion dans Neo4j : crée si absent, sinon met à jour selon id_region
-        graph.merge(node_r, "Region", "id_region")
+    # Fusion de toutes les régions en une requête : crée si absent, sinon met à jour selon id_region
+    ecrire_par_lots(REQUETE_REGIONS, regions)
 
 # ---------------------------------------------------------------
 # 3️⃣ Création des établissements avec association à la région
@@ -138,23 +184,9 @@ def create_etablissements():
         {"id_etablissement": "E59", "nom_etablissement": "LYCEE EX CEM NDIOUM NGAINTH", "type": "Lycée", "statut": "Public", "id_region": "R8"},
     ]
 
-    # Création des nœuds Etablissement et création des relations vers leur Région
-    for e in etablissements:
-        # Création du nœud établissement avec ses propriétés
-        node_e = Node("Etablissement",
-                      id_etablissement=e["id_etablissement"],
-                      nom_etablissement=e["nom_etablissement"],
-                      type=e["type"],
-                      statut=e["statut"],
-                      id_region=e["id_region"])
-        # Fusion ou mise à jour du nœud selon id_etablissement
-        graph.merge(node_e, "Etablissement", "id_etablissement")
-
-        # Recherche du nœud Région correspondant à l'établissement
-        region_node = graph.nodes.match("Region", id_region=e["id_region"]).first()
-        # Si trouvé, création de la relation APPARTIENT_A entre établissement et région
-        if region_node:
-            graph.merge(Relationship(node_e, "APPARTIENT_A", region_node))
+    # Fusion des nœuds Etablissement et relation APPARTIENT_A vers leur Région (si elle existe),
+    # dans la même requête
+    ecrire_par_lots(REQUETE_ETABLISSEMENTS, etablissements)
 
 # -----------------------------------------------
 # 4️⃣ Création des élèves (100 par établissement)
@@ -165,46 +197,34 @@ def create_eleves():
     noms = ["Diop", "Ndoye", "Sarr", "Fall", "Gueye", "Ba", "Dia", "Diallo", "Lo", "Seck"]
     prenoms = ["Mamadou", "Fatou", "Abdoulaye", "Aminata", "Cheikh", "Coumba", "Ousmane", "Sokhna", "Moussa", "Awa"]
 
-    compteur_eleve = 1  # Compteur global pour générer un ID unique pour chaque élève
-
-    # Récupération de tous les établissements créés dans la base Neo4j
-    etablissements = list(graph.nodes.match("Etablissement"))
-
-    # Pour chaque établissement, création de 100 élèves fictifs
-    for etab in etablissements:
-        print(f"Création de 100 élèves pour l'établissement {etab['nom_etablissement']}...")
-        for _ in range(100):
-            # Choix aléatoire des infos de l'élève
-            nom = random.choice(noms)
-            prenom = random.choice(prenoms)
-            sexe = random.choice(sexes)
-            date_naissance = random_date()  # Date entre 2020 et 2024
-
-            # Génération d'un ID unique : ex S00001
-            id_eleve = f"S{compteur_eleve:05d}"
-
-            # Création du nœud Eleve avec ses propriétés
-            eleve_node = Node("Eleve",
-                              id_eleve=id_eleve,
-                              nom=nom,
-                              prenom=prenom,
-                              date_naissance=date_naissance,
-                              sexe=sexe,
-                              id_etablissement=etab["id_etablissement"])
-            # Fusion selon id_eleve
-            graph.merge(eleve_node, "Eleve", "id_eleve")
-
-            # Création de la relation Eleve INSCRIT_A Etablissement
-            graph.merge(Relationship(eleve_node, "INSCRIT_A", etab))
-
-            compteur_eleve += 1  # Incrémentation pour le prochain élève
-
-    print("✅ 100 élèves créés pour chaque établissement.")
+    # Récupération des seuls identifiants des établissements créés dans la base Neo4j
+    ids_etablissements = [r["id"] for r in graph.run("MATCH (e:Etablissement) RETURN e.id_etablissement AS id")]
+
+    # Générateur des élèves : 100 élèves fictifs par établissement
+    def lignes_eleves():
+        compteur_eleve = 1  # Compteur global pour générer un ID unique pour chaque élève
+        for id_etablissement in ids_etablissements:
+            for _ in range(100):
+                yield {
+                    "id_eleve": f"S{compteur_eleve:05d}",  # ID unique : ex S00001
+                    "nom": random.choice(noms),
+                    "prenom": random.choice(prenoms),
+                    "date_naissance": random_date(),  # Date entre 2020 et 2024
+                    "sexe": random.choice(sexes),
+                    "id_etablissement": id_etablissement,
+                }
+                compteur_eleve += 1  # Incrémentation pour le prochain élève
+
+    # Fusion des élèves et de leur relation INSCRIT_A, par lots de TAILLE_LOT
+    nb_eleves = ecrire_par_lots(REQUETE_ELEVES, lignes_eleves())
+
+    print(f"✅ {nb_eleves} élèves créés ({len(ids_etablissements)} établissements).")
 
 # --------------------------------------
 # 5️⃣ Fonction principale qui lance tout
 # --------------------------------------
 def main():
+    creer_contraintes()     # Contraintes d'unicité avant les MERGE
     create_regions()        # Création des régions et villes
     create_etablissements() # Création des établissements et liens avec les régions
     create_eleves()         # Création des élèves pour chaque établissement
@@ -0,0 +1,61 @@
+import itertools
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+# Écriture par lots bornés dans MongoDB : les documents sont consommés au fil de l'eau
+# (liste ou générateur) et envoyés par insert_many de `taille_lot` documents,
+# au lieu d'une seule requête géante avec tout en mémoire.
+
+def lots(documents, taille_lot):
+    documents = iter(documents)
+    while True:
+        lot = list(itertools.islice(documents, taille_lot))
+        if not lot:
+            return
+        yield lot
+
+def inserer_par_lots(collection, documents, taille_lot=5000, ordered=False, threads=1,
+                     bypass_document_validation=False, progression=True):
+    """
+    Insère `documents` dans `collection` par lots de `taille_lot`.
+
+    - ordered=False : le serveur n'arrête pas le lot à la première erreur et peut paralléliser
+    - threads > 1 : plusieurs insert_many en vol ; au plus 2 lots en attente par thread
+    - bypass_document_validation : ignore le validateur de schéma de la collection
+
+    Affiche la progression et le débit, retourne le nombre de documents insérés.
+    """
+    debut = time.perf_counter()
+    total = 0
+
+    def inserer(lot):
+        collection.insert_many(lot, ordered=ordered, bypass_document_validation=bypass_document_validation)
+        return len(lot)
+
+    def afficher():
+        if progression:
+            duree = time.perf_counter() - debut
+            debit = total / duree if duree else 0
+            print(f"\r{collection.name}: {total} documents ({debit:.0f} docs/s)", end="", flush=True)
+
+    if threads <= 1:
+        for lot in lots(documents, taille_lot):
+            total += inserer(lot)
+            afficher()
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            en_vol = set()
+            for lot in lots(documents, taille_lot):
+                if len(en_vol) >= 2 * threads:
+                    faits, en_vol = wait(en_vol, return_when=FIRST_COMPLETED)
+                    for future in faits:
+                        total += future.result()
+                    afficher()
+                en_vol.add(pool.submit(inserer, lot))
+            for future in en_vol:
+                total += future.result()
+            afficher()
+
+    if progression:
+        print()
+    return total
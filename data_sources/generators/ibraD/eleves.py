@@ -2,6 +2,9 @@ from pymongo import MongoClient
 import random
 from faker import Faker
 
+from ecriture_mongo import inserer_par_lots
+from references_mongo import creer_index
+
 fake = Faker("fr_FR")
 
 # Connexion MongoDB
@@ -99,6 +102,7 @@ for region, villes in etablissements_data.items():
                 id_eleve += 1
             id_etablissement += 1
 # Insertion dans MongoDB
-eleves_collection.insert_many(eleves)
+inserer_par_lots(eleves_collection, eleves)
+creer_index(db, "eleves")
 
 print(f"{len(eleves)}la liste des sont insèrer avec succès, sur MongoDB!.")
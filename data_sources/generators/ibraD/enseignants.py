@@ -2,6 +2,8 @@ from pymongo import MongoClient
 from faker import Faker
 import random
 
+from ecriture_mongo import inserer_par_lots
+
 fake = Faker("fr_FR")
 
 # Connexion MongoDB
@@ -56,6 +58,6 @@ for i in range(1, 729):
     enseignants.append(enseignant)
     id_enseignant += 1
 # Insertion dans MongoDB
-enseignants_collection.insert_many(enseignants)
+inserer_par_lots(enseignants_collection, enseignants)
 
 print("728 enseignants insérés dans la collection 'enseignants' de la DB 'datasetMongo'.")
@@ -0,0 +1,99 @@
+from array import array
+from collections.abc import Sequence
+
+# Chargement des références (élèves, cours) utilisées par les générateurs, et index des collections.
+# Seuls les champs utiles sont lus (projection), le curseur est parcouru par lots,
+# et les valeurs sont rangées par colonne : entiers dans des array, textes encodés par dictionnaire.
+
+# collection -> [(champ, unique)]
+INDEX = {
+    "eleves": [("id_eleve", True)],
+    "cours": [("id_cours", True)],
+    "presences": [("eleve.id_eleve", False), ("cours.id_cours", False), ("date_cours", False)],
+    "notes": [("eleve.id_eleve", False), ("cours.id_cours", False)],
+}
+
+def creer_index(db, nom_collection):
+    """Crée les index de INDEX[nom_collection] (sans effet s'ils existent déjà)"""
+    for champ, unique in INDEX.get(nom_collection, []):
+        db[nom_collection].create_index(champ, unique=unique)
+
+def _valeur(document, chemin):
+    for cle in chemin.split("."):
+        document = document[cle]
+    return document
+
+def _entier(valeur):
+    """Vrai si `valeur` tient dans un array("q")"""
+    return type(valeur) is int and -(1 << 63) <= valeur < (1 << 63)
+
+def _hachable(valeur):
+    try:
+        hash(valeur)
+    except TypeError:
+        return False
+    return True
+
+class _Textes:
+    """Colonne de texte encodée par dictionnaire"""
+    def __init__(self):
+        self.codes = array("I")
+        self.valeurs = []
+        self._index = {}
+
+    def append(self, valeur):
+        code = self._index.get(valeur)
+        if code is None:
+            code = self._index[valeur] = len(self.valeurs)
+            self.valeurs.append(valeur)
+        self.codes.append(code)
+
+    def __getitem__(self, i):
+        return self.valeurs[self.codes[i]]
+
+    def __iter__(self):
+        return (self.valeurs[code] for code in self.codes)
+
+class TableReference(Sequence):
+    """
+    Documents réduits aux champs demandés, stockés par colonne.
+    table[i] rend le document {nom: valeur} (nom = dernier segment du champ,
+    ex. "matiere.nom_matiere" -> "nom_matiere") ; utilisable avec random.choice.
+    """
+
+    def __init__(self, champs):
+        self.champs = list(champs)
+        self.noms = [champ.split(".")[-1] for champ in self.champs]
+        self._colonnes = None
+        self._taille = 0
+
+    def ajouter(self, document):
+        valeurs = [_valeur(document, champ) for champ in self.champs]
+        if self._colonnes is None:
+            self._colonnes = [array("q") if _entier(v) else _Textes() for v in valeurs]
+        # Valeur inattendue pour sa colonne (None ou texte parmi des entiers, sous-document
+        # non hachable) : la colonne devient une simple liste, avant tout ajout pour que
+        # les colonnes restent alignées
+        for i, (colonne, valeur) in enumerate(zip(self._colonnes, valeurs)):
+            if ((isinstance(colonne, array) and not _entier(valeur))
+                    or (isinstance(colonne, _Textes) and not _hachable(valeur))):
+                self._colonnes[i] = list(colonne)
+        for colonne, valeur in zip(self._colonnes, valeurs):
+            colonne.append(valeur)
+        self._taille += 1
+
+    def __len__(self):
+        return self._taille
+
+    def __getitem__(self, i):
+        if not -self._taille <= i < self._taille:
+            raise IndexError(i)
+        return {nom: colonne[i] for nom, colonne in zip(self.noms, self._colonnes)}
+
+def charger_references(collection, champs, batch_size=10000):
+    """Lit uniquement `champs` de tous les documents de `collection` dans une TableReference"""
+    table = TableReference(champs)
+    projection = {"_id": 0, **{champ: 1 for champ in champs}}
+    for document in collection.find({}, projection, batch_size=batch_size):
+        table.ajouter(document)
+    return table
@@ -1,11 +1,27 @@
 from faker import Faker
 import random
 from datetime import datetime,timedelta
+import argparse
+import csv
+import itertools
 import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 from dateutil.relativedelta import relativedelta
 from pymysql import connect
 from pymysql.cursors import DictCursor
 
+try:
+    import numpy as np
+    from moteur_vectorise import MoteurVectorise, jours_ouvres, lignes_colonnes
+except ImportError:  # numpy n'est requis que pour --moteur numpy
+    np = None
+    MoteurVectorise = None
+
 faker = Faker('fr_FR')  # localisation francophone pour style sénégalais
 
 REGIONS_SN = [
@@ -81,12 +97,12 @@ def generate_matieres():
 
 
 
-def generate_eleves():
+def generate_eleves(min_par_etab=70, max_par_etab=150):
     eleves = []
     id_counter = 1
 
     for etab in ETABLISSEMENTS:
-        n = random.randint(70,150)
+        n = random.randint(min_par_etab, max_par_etab)
         for _ in range(n):
             sexe = random.choice(['M', 'F'])
             prenom = random.choice(prenoms_masculins if sexe == 'M' else prenoms_feminins)
@@ -126,8 +142,8 @@ def generate_cours(n, matieres, enseignants):
 
     return cours
 
-def generate_presences(eleves, cours):
-    presences = []
+def iter_presences(eleves, cours):
+    """Génère les présences une à une, sans les garder en mémoire"""
     id_presence = 1
 
     start_date = datetime(2022, 10, 1)
@@ -139,38 +155,42 @@ def generate_presences(eleves, cours):
         if current.weekday() < 5 and current.month not in [7, 8, 9]:
             # Choisir jusqu’à 3 cours différents aléatoirement
             selected_courses = random.sample(cours, min(3, len(cours)))
+            date_cours = current.strftime("%Y-%m-%d")
             for cour in selected_courses:
                 for eleve in eleves:
-                    presences.append({
+                    yield {
                         "id_presence": id_presence,
                         "id_eleve": eleve["id_eleve"],
                         "id_cours": cour["id_cours"],
-                        "date_cours": current.strftime("%Y-%m-%d"),
+                        "date_cours": date_cours,
                         "present": random.random() < 0.9
-                    })
+                    }
                     id_presence += 1
         current += timedelta(days=1)
 
-    return presences
+def generate_presences(eleves, cours):
+    return list(iter_presences(eleves, cours))
 
-def generate_notes(eleves, matieres, annees):
-    notes = []
+def iter_notes(eleves, matieres, annees):
+    """Génère les notes une à une, sans les garder en mémoire"""
     id_note = 1
 
     for eleve in eleves:
         for matiere in matieres:
             for annee in annees:
                 for type_note in ["devoir", "examen"]:
-                    notes.append({
+                    yield {
                         "id_note": id_note,
                         "id_eleve": eleve["id_eleve"],
                         "id_matiere": matiere["id_matiere"],
                         "annee": annee,
                         "type": type_note,
                         "note": round(random.uniform(5, 20), 2)  # note réaliste entre 5 et 20
-                    })
+                    }
                     id_note += 1
-    return notes
+
+def generate_notes(eleves, matieres, annees):
+    return list(iter_notes(eleves, matieres, annees))
 
 def generate_enseignement(n=20, enseignant_ids=[], matiere_ids=[]):
     return [{
@@ -243,33 +263,397 @@ def insert_notes(cursor, notes):
             )
         )
 
-if __name__ == "__main__":
-    # Générer les ID nécessaires pour les relations
-    regions = REGIONS_SN
-    etablissements = ETABLISSEMENTS
-    enseignants = generate_enseignants(40)
+# ===============================
+# CHARGEMENT EN MASSE
+# ===============================
+# Les insert_* ci-dessus font un aller-retour serveur par ligne. Les chargements suivants
+# envoient les lignes par lots et commitent tous les `commit_lots` lots.
+
+# table -> colonnes (mêmes noms que les clés des dicts générés)
+COLONNES = {
+    "regions": ("id_region", "nom_region", "ville"),
+    "etablissements": ("id_etablissement", "id_region", "nom_etablissement", "status"),
+    "enseignants": ("id_enseignant", "nom_enseignant", "email", "domaine", "sexe"),
+    "matieres": ("id_matiere", "nom_matiere"),
+    "eleves": ("id_eleve", "nom_eleve", "prenom_eleve", "date_naissance", "sexe", "redouble", "id_etablissement"),
+    "cours": ("id_cours", "niveau", "duree", "id_matiere", "id_enseignant"),
+    "presence": ("id_presence", "id_eleve", "id_cours", "date_cours", "present"),
+    "noter": ("id_note", "id_eleve", "id_matiere", "annee", "type", "note"),
+}
+
+def lots(lignes, taille_lot):
+    """Découpe un itérable (liste ou générateur) en listes de `taille_lot` éléments"""
+    lignes = iter(lignes)
+    while True:
+        lot = list(itertools.islice(lignes, taille_lot))
+        if not lot:
+            return
+        yield lot
+
+_FIN = object()
+
+def lots_en_avance(lignes, taille_lot, profondeur=2):
+    """
+    Comme lots(), mais les lots sont produits dans un thread, au plus `profondeur` à l'avance :
+    la génération du lot suivant se fait pendant l'insertion du lot courant.
+    """
+    file_lots = queue.Queue(maxsize=profondeur)
+    erreurs = []
+    arret = threading.Event()
+
+    def produire():
+        try:
+            for lot in lots(lignes, taille_lot):
+                if arret.is_set():
+                    return
+                file_lots.put(lot)
+        except Exception as e:
+            erreurs.append(e)
+        finally:
+            file_lots.put(_FIN)
+
+    thread = threading.Thread(target=produire, daemon=True)
+    thread.start()
+    try:
+        while True:
+            lot = file_lots.get()
+            if lot is _FIN:
+                break
+            yield lot
+    finally:
+        # Consommateur interrompu (erreur d'insertion) : libérer le producteur
+        arret.set()
+        while thread.is_alive():
+            try:
+                file_lots.get(timeout=0.1)
+            except queue.Empty:
+                pass
+    if erreurs:
+        raise erreurs[0]
+
+def _valeurs(ligne, colonnes):
+    """Valeurs d'une ligne dans l'ordre des colonnes (dict généré, ou tuple déjà ordonné)"""
+    if isinstance(ligne, tuple):
+        return ligne
+    return tuple(ligne[col] for col in colonnes)
+
+def bulk_insert(conn, table, lignes, taille_lot=5000, commit_lots=10):
+    """
+    Insère les `lignes` (dicts ou tuples dans l'ordre de COLONNES[table]) par executemany : pymysql regroupe chaque lot
+    en INSERT ... VALUES (...), (...) multi-lignes. Retourne le nombre de lignes.
+    """
+    colonnes = COLONNES[table]
+    requete = f"INSERT INTO {table} ({', '.join(colonnes)}) VALUES ({', '.join(['%s'] * len(colonnes))})"
+    total = 0
+    with conn.cursor() as cursor:
+        for i, lot in enumerate(lots_en_avance(lignes, taille_lot), start=1):
+            cursor.executemany(requete, [_valeurs(ligne, colonnes) for ligne in lot])
+            total += len(lot)
+            if i % commit_lots == 0:
+                conn.commit()
+    conn.commit()
+    return total
+
+def _valeur_csv(valeur):
+    if valeur is None:
+        return "\\N"
+    if isinstance(valeur, bool):
+        return int(valeur)
+    return valeur
+
+def load_data_insert(conn, table, lignes, taille_lot=50000, commit_lots=1):
+    """
+    Écrit les lignes dans des CSV temporaires de `taille_lot` lignes et les charge avec
+    LOAD DATA LOCAL INFILE (connexion ouverte avec local_infile=True). Retourne le nombre de lignes.
+    """
+    colonnes = COLONNES[table]
+    requete = (
+        f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} "
+        "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' "
+        "LINES TERMINATED BY '\\n' "
+        f"({', '.join(colonnes)})"
+    )
+    total = 0
+    with conn.cursor() as cursor:
+        for i, lot in enumerate(lots_en_avance(lignes, taille_lot), start=1):
+            with tempfile.NamedTemporaryFile("w", suffix=".csv", newline="", encoding="utf-8", delete=False) as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerows([_valeur_csv(v) for v in _valeurs(ligne, colonnes)] for ligne in lot)
+            try:
+                cursor.execute(requete, (f.name,))
+            finally:
+                os.remove(f.name)
+            total += len(lot)
+            if i % commit_lots == 0:
+                conn.commit()
+    conn.commit()
+    return total
+
+METHODES = {
+    "executemany": bulk_insert,
+    "load_data": load_data_insert,
+}
+
+def charger(conn, table, lignes, methode="executemany", taille_lot=5000, commit_lots=10):
+    """Charge une table avec la méthode choisie et affiche le débit"""
+    debut = time.perf_counter()
+    total = METHODES[methode](conn, table, lignes, taille_lot, commit_lots)
+    duree = time.perf_counter() - debut
+    debit = total / duree if duree else 0
+    print(f"{table}: {total} lignes en {duree:.1f}s ({debit:.0f} lignes/s)")
+    return total
+
+# ===============================
+# GÉNÉRATION VECTORISÉE (NUMPY)
+# ===============================
+# Mêmes données que generate_eleves / iter_presences / iter_notes, tirées par colonnes entières.
+# Les lots sont des dicts colonne -> np.ndarray aux noms de COLONNES.
+
+def effectifs_eleves(moteur, etablissements=ETABLISSEMENTS, min_par_etab=70, max_par_etab=150):
+    """Nombre d'élèves de chaque établissement"""
+    return moteur.entiers(min_par_etab, max_par_etab, len(etablissements))
+
+# Calendrier scolaire des présences (moteur vectorisé)
+DEBUT_CALENDRIER = "2022-10-01"
+FIN_CALENDRIER = "2024-06-30"
+
+def colonnes_eleves(moteur, effectifs, etablissements=ETABLISSEMENTS, debut=0, fin=None):
+    """
+    Élèves d'indices [debut, fin) parmi sum(effectifs) (tous par défaut).
+    L'id d'un élève vaut son indice + 1, quelle que soit la tranche générée.
+    """
+    id_etablissements = np.repeat([etab["id_etablissement"] for etab in etablissements], effectifs)
+    fin = len(id_etablissements) if fin is None else fin
+    n = fin - debut
+    sexe = moteur.choix(SEXE, n)
+    return {
+        "id_eleve": np.arange(debut + 1, fin + 1),
+        "nom_eleve": moteur.choix(noms_famille, n),
+        "prenom_eleve": np.where(sexe == "M", moteur.choix(prenoms_masculins, n), moteur.choix(prenoms_feminins, n)),
+        # Âges calculés à la fin du calendrier, pas à date.today() : même graine, mêmes dates
+        "date_naissance": moteur.dates_naissance(18, 23, n, reference=FIN_CALENDRIER),
+        "sexe": sexe,
+        "redouble": moteur.bernoulli(0.5, n),
+        "id_etablissement": id_etablissements[debut:fin],
+    }
+
+def colonnes_enseignants(moteur, n, taille_pool=1000):
+    """Enseignants tirés par colonnes : noms et emails dans des pools Faker remplis une fois"""
+    taille_pool = min(taille_pool, n)
+    return {
+        "id_enseignant": np.arange(1, n + 1),
+        "nom_enseignant": moteur.depuis_pool("name", n, taille_pool),
+        "email": moteur.depuis_pool("email", n, taille_pool),
+        "domaine": moteur.choix(MATIERES_SN, n),
+        "sexe": moteur.choix(SEXE, n),
+    }
+
+def lots_presences(moteur, ids_eleves, ids_cours, taille_lot=50000, tirage_cours=None, nb_eleves_total=None):
+    """
+    Présences par lots de jours ouvrés : 3 cours distincts par jour, présent à 90 %.
+    Pour une tranche d'élèves, `tirage_cours` (même graine pour toutes les tranches) fixe les cours
+    de chaque jour et `nb_eleves_total` rend l'id_presence indépendant du découpage :
+    id = (jour * nb_cours + cours) * nb_eleves_total + id_eleve.
+    """
+    jours = jours_ouvres(DEBUT_CALENDRIER, FIN_CALENDRIER)
+    ids_eleves = np.asarray(ids_eleves)
+    nb_eleves_total = nb_eleves_total or len(ids_eleves)
+    nb_cours = min(3, len(ids_cours))
+    cours_par_jour = (tirage_cours or moteur).sans_remise(ids_cours, nb_cours, len(jours))
+    par_jour = nb_cours * len(ids_eleves)
+    jours_par_lot = max(1, taille_lot // max(par_jour, 1))
+
+    for debut in range(0, len(jours), jours_par_lot):
+        jours_lot = jours[debut:debut + jours_par_lot]
+        n = len(jours_lot) * par_jour
+        creneaux = np.arange(debut * nb_cours, (debut + len(jours_lot)) * nb_cours)
+        yield {
+            "id_presence": (np.repeat(creneaux, len(ids_eleves)) * nb_eleves_total
+                            + np.tile(ids_eleves, len(creneaux))),
+            "id_eleve": np.tile(ids_eleves, len(creneaux)),
+            "id_cours": np.repeat(cours_par_jour[debut:debut + len(jours_lot)].ravel(), len(ids_eleves)),
+            "date_cours": np.repeat(jours_lot, par_jour),
+            "present": moteur.bernoulli(0.9, n),
+        }
+
+def lots_notes(moteur, ids_eleves, ids_matieres, annees, taille_lot=50000):
+    """
+    Notes par lots d'élèves : un devoir et un examen par élève, matière et année.
+    id = (id_eleve - 1) * notes par élève + rang, indépendant du découpage en tranches.
+    """
+    ids_eleves = np.asarray(ids_eleves)
+    types = np.array(["devoir", "examen"])
+    par_eleve = len(ids_matieres) * len(annees) * len(types)
+    eleves_par_lot = max(1, taille_lot // max(par_eleve, 1))
+
+    for debut in range(0, len(ids_eleves), eleves_par_lot):
+        eleves_lot = ids_eleves[debut:debut + eleves_par_lot]
+        n = len(eleves_lot) * par_eleve
+        yield {
+            "id_note": np.repeat((eleves_lot - 1) * par_eleve, par_eleve) + np.tile(np.arange(1, par_eleve + 1), len(eleves_lot)),
+            "id_eleve": np.repeat(eleves_lot, par_eleve),
+            "id_matiere": np.tile(np.repeat(ids_matieres, len(annees) * len(types)), len(eleves_lot)),
+            "annee": np.tile(np.repeat(annees, len(types)), len(eleves_lot) * len(ids_matieres)),
+            "type": np.tile(types, len(eleves_lot) * len(ids_matieres) * len(annees)),
+            "note": moteur.uniforme(5, 20, n),
+        }
+
+# ===============================
+# FACTEUR D'ÉCHELLE ET GÉNÉRATION PARTITIONNÉE
+# ===============================
+# --scale-factor multiplie toutes les tailles (1 = jeu de données d'origine).
+# En mode partitionné, chaque partition (processus) régénère les mêmes données de référence
+# à partir de la graine et ne produit que sa tranche d'élèves, avec leurs présences et notes :
+# les ids sont disjoints et une partition donne toujours les mêmes lignes.
+
+ANNEES_NOTES = [2020, 2021, 2022, 2023, 2024]
+
+def tailles(scale_factor=1.0):
+    return {
+        "enseignants": max(1, round(40 * scale_factor)),
+        "cours": max(3, round(10 * scale_factor)),
+        "min_par_etab": max(1, round(70 * scale_factor)),
+        "max_par_etab": max(1, round(150 * scale_factor)),
+    }
+
+def donnees_reference(graine, scale_factor=1.0):
+    """Enseignants, matières, cours et effectifs d'élèves, identiques dans toutes les partitions"""
+    random.seed(graine)
+    Faker.seed(graine)
+    taille = tailles(scale_factor)
+    moteur = MoteurVectorise(graine, faker)
+    effectifs = effectifs_eleves(moteur, ETABLISSEMENTS, taille["min_par_etab"], taille["max_par_etab"])
+    colonnes = COLONNES["enseignants"]
+    enseignants = [dict(zip(colonnes, valeurs)) for valeurs in
+                   lignes_colonnes([colonnes_enseignants(moteur, taille["enseignants"])], colonnes)]
     matieres = generate_matieres()
-    eleves = generate_eleves()
-    cours = generate_cours(10, matieres,enseignants)
-    presence = generate_presences(eleves,cours)
-    notes = generate_notes(eleves,matieres,[2020,2021,2022,2023,2024])
-    conn = connect(database="education",port=3308,user="root",password="1234",host="localhost",cursorclass=DictCursor)
-
+    cours = generate_cours(taille["cours"], matieres, enseignants)
+    return enseignants, matieres, cours, effectifs
+
+def tranche(nb_eleves, partition, partitions):
+    """Indices [debut, fin) des élèves de `partition` parmi `partitions` tranches contiguës"""
+    return nb_eleves * partition // partitions, nb_eleves * (partition + 1) // partitions
+
+def tables_partition(graine, partition, partitions, scale_factor=1.0):
+    """
+    Tables à charger par une partition : [(table, lignes)].
+    La partition 0 charge aussi les tables de référence.
+    """
+    enseignants, matieres, cours, effectifs = donnees_reference(graine, scale_factor)
+    nb_eleves = int(effectifs.sum())
+    debut, fin = tranche(nb_eleves, partition, partitions)
+    # Graine propre à la partition pour ses lignes, graine commune pour les cours du jour
+    moteur = MoteurVectorise([graine, partition])
+    eleves = colonnes_eleves(moteur, effectifs, ETABLISSEMENTS, debut, fin)
+    ids_cours = [cour["id_cours"] for cour in cours]
+    ids_matieres = [matiere["id_matiere"] for matiere in matieres]
+
+    tables = []
+    if partition == 0:
+        tables += [("regions", REGIONS_SN), ("etablissements", ETABLISSEMENTS), ("enseignants", enseignants),
+                   ("matieres", matieres), ("cours", cours)]
+    tables += [
+        ("eleves", lignes_colonnes([eleves], COLONNES["eleves"])),
+        ("presence", lignes_colonnes(lots_presences(moteur, eleves["id_eleve"], ids_cours,
+                                                    tirage_cours=MoteurVectorise(graine), nb_eleves_total=nb_eleves),
+                                     COLONNES["presence"])),
+        ("noter", lignes_colonnes(lots_notes(moteur, eleves["id_eleve"], ids_matieres, ANNEES_NOTES),
+                                  COLONNES["noter"])),
+    ]
+    return tables
+
+def connexion(local_infile=False):
+    return connect(database="education",port=3308,user="root",password="1234",host="localhost",cursorclass=DictCursor,
+                   local_infile=local_infile)
+
+def charger_partition(graine, partition, partitions, scale_factor=1.0, methode="executemany",
+                      taille_lot=5000, commit_lots=10):
+    """Génère et charge une partition sur sa propre connexion (point d'entrée des processus)"""
+    conn = connexion(local_infile=methode == "load_data")
     try:
-        with conn.cursor() as cursor:
-            insert_regions(cursor, REGIONS_SN)
-            insert_etablissements(cursor, ETABLISSEMENTS)
-            insert_enseignants(cursor, enseignants)
-            insert_matieres(cursor, matieres)
-            insert_eleves(cursor, eleves)
-            insert_cours(cursor, cours)
-            insert_presences(cursor, presence)
-            insert_notes(cursor, notes)
-        conn.commit()
-        print("Toutes les données ont été insérées avec succès.")   
-    except Exception as e:
-        conn.rollback()
-        print("Erreur lors de l'insertion :", e)
+        total = 0
+        for table, lignes in tables_partition(graine, partition, partitions, scale_factor):
+            print(f"[partition {partition}/{partitions}] ", end="")
+            total += charger(conn, table, lignes, methode, taille_lot, commit_lots)
+        return total
     finally:
         conn.close()
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Génère et insère les données du système éducatif dans MySQL")
+    parser.add_argument("--methode", choices=["ligne", *METHODES], default="executemany",
+                        help="ligne : un INSERT par ligne ; executemany : INSERT multi-lignes ; load_data : LOAD DATA LOCAL INFILE")
+    parser.add_argument("--taille-lot", type=int, default=5000)
+    parser.add_argument("--commit-lots", type=int, default=10, help="Commit tous les N lots")
+    parser.add_argument("--moteur", choices=["python", "numpy"], default="python",
+                        help="numpy : élèves, présences et notes tirés par colonnes (chargement en masse uniquement)")
+    parser.add_argument("--graine", type=int, default=None)
+    parser.add_argument("--scale-factor", type=float, default=1.0, help="Multiplie la taille de toutes les entités")
+    parser.add_argument("--partitions", type=int, default=1,
+                        help="Découpe les élèves (et leurs présences/notes) en N tranches déterministes")
+    parser.add_argument("--partition", type=int, default=None,
+                        help="Ne génère que cette partition (sinon toutes, une par processus)")
+    parser.add_argument("--processus", type=int, default=None, help="Nombre de processus (défaut : --partitions)")
+    args = parser.parse_args()
+    if args.partitions < 1:
+        parser.error("--partitions doit être au moins 1")
+    if args.partition is not None and not 0 <= args.partition < args.partitions:
+        parser.error(f"--partition doit être entre 0 et {args.partitions - 1} (--partitions {args.partitions})")
+    vectorise = args.moteur == "numpy" or args.partitions > 1 or args.partition is not None
+    if vectorise:
+        if MoteurVectorise is None:
+            parser.error("--moteur numpy, --partitions et --partition nécessitent numpy (pip install numpy)")
+        if args.methode == "ligne":
+            parser.error("--moteur numpy, --partitions et --partition nécessitent --methode executemany ou load_data")
+
+    if vectorise:
+        if args.graine is None:
+            args.graine = random.randrange(2 ** 32)
+            print(f"Graine : {args.graine} (--graine {args.graine} pour reproduire)")
+        partitions = [args.partition] if args.partition is not None else range(args.partitions)
+        debut = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=args.processus or len(partitions)) as pool:
+            futures = [pool.submit(charger_partition, args.graine, p, args.partitions, args.scale_factor,
+                                   args.methode, args.taille_lot, args.commit_lots) for p in partitions]
+            total = sum(future.result() for future in futures)
+        duree = time.perf_counter() - debut
+        print(f"{total} lignes en {duree:.1f}s ({total / duree:.0f} lignes/s)")
+    else:
+        if args.graine is not None:
+            random.seed(args.graine)
+            Faker.seed(args.graine)
+        taille = tailles(args.scale_factor)
+        # Générer les ID nécessaires pour les relations
+        enseignants = generate_enseignants(taille["enseignants"])
+        matieres = generate_matieres()
+        eleves = generate_eleves(taille["min_par_etab"], taille["max_par_etab"])
+        cours = generate_cours(taille["cours"], matieres,enseignants)
+        # Présences et notes : générées au fil de l'insertion, mémoire constante
+        presence = iter_presences(eleves,cours)
+        notes = iter_notes(eleves,matieres,ANNEES_NOTES)
+        conn = connexion(local_infile=args.methode == "load_data")
+
+        try:
+            if args.methode == "ligne":
+                with conn.cursor() as cursor:
+                    insert_regions(cursor, REGIONS_SN)
+                    insert_etablissements(cursor, ETABLISSEMENTS)
+                    insert_enseignants(cursor, enseignants)
+                    insert_matieres(cursor, matieres)
+                    insert_eleves(cursor, eleves)
+                    insert_cours(cursor, cours)
+                    insert_presences(cursor, presence)
+                    insert_notes(cursor, notes)
+                conn.commit()
+            else:
+                for table, lignes in [("regions", REGIONS_SN), ("etablissements", ETABLISSEMENTS),
+                                      ("enseignants", enseignants), ("matieres", matieres), ("eleves", eleves),
+                                      ("cours", cours), ("presence", presence), ("noter", notes)]:
+                    charger(conn, table, lignes, args.methode, args.taille_lot, args.commit_lots)
+            print("Toutes les données ont été insérées avec succès.")   
+        except Exception as e:
+            conn.rollback()
+            print("Erreur lors de l'insertion :", e)
+        finally:
+            conn.close()
+
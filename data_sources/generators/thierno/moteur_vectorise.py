@@ -0,0 +1,80 @@
+from datetime import date
+
+import numpy as np
+
+# ===============================
+# MOTEUR DE GÉNÉRATION VECTORISÉ
+# ===============================
+# Tire des colonnes entières d'un coup avec un numpy.random.Generator initialisé par une graine,
+# au lieu d'un random.choice / faker.xxx() par ligne. Faker ne sert qu'à remplir des pools
+# de valeurs tirées une fois. Les colonnes produites (dict nom -> np.ndarray) se convertissent
+# en lignes pour les chargements en masse avec lignes_colonnes().
+
+LUNDI_EPOCH = 3  # 1970-01-01 était un jeudi
+
+class MoteurVectorise:
+    def __init__(self, graine=None, faker=None):
+        self.rng = np.random.default_rng(graine)
+        self.faker = faker
+        self._pools = {}
+
+    def choix(self, valeurs, n, p=None):
+        """n tirages catégoriels parmi `valeurs` (probabilités `p`, uniformes par défaut)"""
+        return np.asarray(valeurs)[self.rng.choice(len(valeurs), size=n, p=p)]
+
+    def entiers(self, bas, haut, n):
+        """n entiers dans [bas, haut] (bornes incluses, comme random.randint)"""
+        return self.rng.integers(bas, haut, size=n, endpoint=True)
+
+    def uniforme(self, bas, haut, n, decimales=2):
+        return np.round(self.rng.uniform(bas, haut, size=n), decimales)
+
+    def bernoulli(self, p, n):
+        """n booléens vrais avec la probabilité `p`"""
+        return self.rng.random(n) < p
+
+    def dates(self, debut, fin, n):
+        """n dates uniformes entre `debut` et `fin` incluses"""
+        debut, fin = np.datetime64(debut, "D"), np.datetime64(fin, "D")
+        return debut + self.rng.integers(0, (fin - debut).astype(int), size=n, endpoint=True)
+
+    def dates_naissance(self, age_min, age_max, n, reference=None):
+        """
+        Dates de naissance pour des âges entre `age_min` et `age_max` ans à la date `reference`
+        (comme faker.date_of_birth) ; date.today() par défaut, à fixer pour un tirage reproductible
+        """
+        reference = np.datetime64(reference or date.today(), "D")
+        plus_jeune = reference - np.timedelta64(365 * age_min, "D")
+        plus_vieux = reference - np.timedelta64(365 * (age_max + 1) - 1, "D")
+        return self.dates(plus_vieux, plus_jeune, n)
+
+    def sans_remise(self, valeurs, k, n):
+        """n tirages de `k` valeurs distinctes (une ligne par tirage, comme random.sample)"""
+        valeurs = np.asarray(valeurs)
+        indices = np.argsort(self.rng.random((n, len(valeurs))), axis=1)[:, :k]
+        return valeurs[indices]
+
+    def pool(self, methode, taille=1000):
+        """
+        Pool de `taille` valeurs produites une fois par Faker (ex. "name", "email"),
+        dans lequel on tire ensuite avec choix()
+        """
+        if methode not in self._pools:
+            generer = getattr(self.faker, methode)
+            self._pools[methode] = np.array([generer() for _ in range(taille)], dtype=object)
+        return self._pools[methode]
+
+    def depuis_pool(self, methode, n, taille=1000):
+        return self.choix(self.pool(methode, taille), n)
+
+def jours_ouvres(debut, fin, mois_exclus=(7, 8, 9)):
+    """Jours du lundi au vendredi entre `debut` et `fin`, hors `mois_exclus` (vacances)"""
+    jours = np.arange(np.datetime64(debut, "D"), np.datetime64(fin, "D") + 1)
+    jour_semaine = (jours.astype(int) + LUNDI_EPOCH) % 7
+    mois = jours.astype("datetime64[M]").astype(int) % 12 + 1
+    return jours[(jour_semaine < 5) & ~np.isin(mois, mois_exclus)]
+
+def lignes_colonnes(lots_colonnes, colonnes):
+    """Convertit des lots de colonnes en tuples de valeurs Python, dans l'ordre de `colonnes`"""
+    for lot in lots_colonnes:
+        yield from zip(*(lot[col].tolist() for col in colonnes))
@@ -1,7 +1,24 @@
 import os
 import csv
-from datetime import datetime
+import itertools
+import json
+import re
+import time
+import unicodedata
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+from cassandra import OperationTimedOut, WriteTimeout
 from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent
+from cassandra.query import BatchStatement, BatchType
+from lecture_json import lots_fichier_json
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+except ImportError:  # lecture CSV native optionnelle
+    pa = None
+    pacsv = None
 
 def deviner_type_colonne(nom_col, valeurs):
     """
@@ -37,13 +54,15 @@ def deviner_type_colonne(nom_col, valeurs):
     # text par défaut
     return "text"
 
-def creer_table_dyn(session, keyspace, table_name, colonnes_types):
+def creer_table_dyn(session, keyspace, table_name, colonnes_types, forcer_cle_int=True):
     """
     Crée une table Cassandra avec colonnes et types donnés.
-    La première colonne est PRIMARY KEY (forcée en int).
+    La première colonne est PRIMARY KEY (forcée en int, sauf `forcer_cle_int=False`
+    quand son type vient de l'inférence complète).
     """
     cle_primaire = list(colonnes_types.keys())[0]
-    colonnes_types[cle_primaire] = "int"
+    if forcer_cle_int:
+        colonnes_types[cle_primaire] = "int"
 
     colonnes_str = []
     for nom, typ in colonnes_types.items():
@@ -61,6 +80,228 @@ def creer_table_dyn(session, keyspace, table_name, colonnes_types):
     session.execute(cql)
     print(f"✅ Table {table_name} créée avec colonnes {colonnes_types}")
 
+# ===============================
+# INFÉRENCE COMPLÈTE DES TYPES (streaming)
+# ===============================
+# Élargissement numérique : int -> bigint -> decimal ; tout autre conflit -> text
+ORDRE_NUMERIQUE = {"int": 0, "bigint": 1, "decimal": 2}
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+def type_valeur(val):
+    """Type Cassandra le plus étroit capable de représenter la chaîne `val` (non vide)."""
+    if val.lower() in ("true", "false"):
+        return "boolean"
+    try:
+        n = int(val)
+        if -2 ** 31 <= n < 2 ** 31:
+            return "int"
+        if -2 ** 63 <= n < 2 ** 63:
+            return "bigint"
+        return "decimal"
+    except ValueError:
+        pass
+    try:
+        if Decimal(val).is_finite():
+            return "decimal"
+    except InvalidOperation:
+        pass
+    if DATE_RE.match(val):
+        try:
+            date.fromisoformat(val)
+            return "date"
+        except ValueError:
+            pass
+    return "text"
+
+def elargir(type_a, type_b):
+    if type_a is None or type_a == type_b:
+        return type_b
+    if type_b is None:
+        return type_a
+    if type_a in ORDRE_NUMERIQUE and type_b in ORDRE_NUMERIQUE:
+        return max(type_a, type_b, key=ORDRE_NUMERIQUE.get)
+    return "text"
+
+def inferer_types_fichier(fichier_csv, taille_lot=50000):
+    """
+    Parcourt tout le fichier par blocs de `taille_lot` lignes et élargit le type de chaque
+    colonne au fil de l'eau. Seules les valeurs distinctes de chaque bloc sont examinées,
+    et une colonne passée en text n'est plus testée. Retourne (colonnes, {colonne: type}).
+    """
+    blocs = blocs_bruts(fichier_csv, taille_lot)
+    colonnes = next(blocs)
+    types = [None] * len(colonnes)
+    for lot in blocs:
+        for i, valeurs in enumerate(zip(*lot)):
+            if types[i] == "text":
+                continue
+            for val in set(valeurs):
+                if val != '':
+                    types[i] = elargir(types[i], type_valeur(val))
+                    if types[i] == "text":
+                        break
+    # Colonne entièrement vide : text
+    return colonnes, {col: typ or "text" for col, typ in zip(colonnes, types)}
+
+# ===============================
+# CONVERTISSEURS PAR COLONNE
+# ===============================
+def _texte(val):
+    return val
+
+def _booleen(val):
+    val = val.lower()
+    if val == "true":
+        return True
+    if val == "false":
+        return False
+    raise ValueError(val)
+
+CONVERTISSEURS = {
+    "boolean": _booleen,
+    "int": int,
+    "bigint": int,
+    "decimal": Decimal,
+    "date": date.fromisoformat,
+    "text": _texte,
+}
+
+def compiler_convertisseurs(colonnes, colonnes_types):
+    """
+    Construit, une fois par table, une fonction de conversion par colonne qui traite
+    une colonne entière d'un bloc. Une valeur incompatible lève une erreur au lieu
+    d'être remplacée par NULL.
+    """
+    def compiler(col, typ):
+        fn = CONVERTISSEURS[typ]
+
+        def convertir(valeurs):
+            try:
+                return [fn(val) if val != '' else None for val in valeurs]
+            except (ValueError, InvalidOperation):
+                fautive = next(val for val in valeurs if val != '' and not _convertible(fn, val))
+                raise ValueError(f"Colonne {col} : valeur {fautive!r} incompatible avec le type {typ} "
+                                 f"(utiliser inference_complete=True)") from None
+        return convertir
+    return [compiler(col, colonnes_types[col]) for col in colonnes]
+
+def _convertible(fn, val):
+    try:
+        fn(val)
+        return True
+    except (ValueError, InvalidOperation):
+        return False
+
+def _blocs(reader, taille_lot):
+    while True:
+        lot = list(itertools.islice(reader, taille_lot))
+        if not lot:
+            return
+        yield lot
+
+# ===============================
+# SOURCES JSON (tableau ou NDJSON)
+# ===============================
+EXTENSIONS_JSON = ('.json', '.ndjson', '.jsonl')
+
+def est_json(fichier):
+    return fichier.lower().endswith(EXTENSIONS_JSON)
+
+def nom_cql(nom):
+    """Identifiant CQL non quoté : 'Date Naissance' -> 'date_naissance', 'Régions' -> 'regions'."""
+    nom = unicodedata.normalize('NFKD', nom).encode('ascii', 'ignore').decode()
+    nom = re.sub(r'\W+', '_', nom).strip('_').lower()
+    return nom if nom and not nom[0].isdigit() else f"c_{nom}"
+
+def _chaine(val):
+    """Valeur JSON ramenée à sa forme texte CSV (même inférence et mêmes convertisseurs)."""
+    if val is None:
+        return ''
+    if isinstance(val, bool):
+        return "true" if val else "false"
+    if isinstance(val, (dict, list)):
+        return json.dumps(val, ensure_ascii=False)
+    return str(val)
+
+def _blocs_json(fichier_json, taille_lot):
+    lots = lots_fichier_json(fichier_json, taille_lot)
+    premier = next(lots, [])
+    # Colonnes = clés du premier document ; une clé absente d'un document vaut NULL
+    cles = list(premier[0]) if premier else []
+    yield [nom_cql(cle) for cle in cles]
+    for lot in itertools.chain([premier], lots):
+        if lot:
+            yield [[_chaine(doc.get(cle)) for cle in cles] for doc in lot]
+
+def blocs_bruts(fichier, taille_lot):
+    """
+    Générateur : produit d'abord la liste des colonnes, puis des blocs d'au plus `taille_lot`
+    lignes de chaînes ('' = valeur absente). Le fichier est un CSV, ou un JSON lu de façon
+    incrémentale (tableau de documents ou NDJSON) dont les clés sont converties par nom_cql.
+    """
+    if est_json(fichier):
+        yield from _blocs_json(fichier, taille_lot)
+        return
+    with open(fichier, newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        entete = next(reader)
+        yield entete
+        numero = 0
+        # Lignes vides ignorées (comme pyarrow) ; une ligne de largeur différente de l'en-tête
+        # est une erreur : zip(*lot) tronquerait sinon toutes les colonnes en silence
+        for lot in _blocs((row for row in reader if row), taille_lot):
+            for i, row in enumerate(lot):
+                if len(row) != len(entete):
+                    raise ValueError(f"{fichier} : enregistrement n°{numero + i + 1} à {len(row)} champs, "
+                                     f"{len(entete)} attendus (en-tête {entete})")
+            numero += len(lot)
+            yield lot
+
+def _lots_python(fichier_csv, colonnes, colonnes_types, taille_lot):
+    convertisseurs = compiler_convertisseurs(colonnes, colonnes_types)
+    blocs = blocs_bruts(fichier_csv, taille_lot)
+    entete = next(blocs)
+    indices = [entete.index(col) for col in colonnes]
+    for lot in blocs:
+        colonnes_brutes = list(zip(*lot))
+        converties = [conv(colonnes_brutes[i]) for conv, i in zip(convertisseurs, indices)]
+        yield list(zip(*converties))
+
+# Types Arrow utilisés pour le parsing natif (decimal relu en texte puis converti)
+ARROW_TYPES = {"boolean": "bool_", "int": "int32", "bigint": "int64", "date": "date32", "decimal": "string", "text": "string"}
+
+def _lots_arrow(fichier_csv, colonnes, colonnes_types, taille_lot):
+    convert_options = pacsv.ConvertOptions(
+        column_types={col: getattr(pa, ARROW_TYPES[colonnes_types[col]])() for col in colonnes},
+        include_columns=list(colonnes),
+        null_values=[""], strings_can_be_null=True,
+        true_values=["true", "True", "TRUE"], false_values=["false", "False", "FALSE"],
+    )
+    # block_size approximatif : ~200 octets par ligne
+    read_options = pacsv.ReadOptions(block_size=max(1 << 20, taille_lot * 200))
+    # Champs entre guillemets sur plusieurs lignes acceptés, comme avec le module csv
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    with pacsv.open_csv(fichier_csv, read_options=read_options, parse_options=parse_options,
+                        convert_options=convert_options) as reader:
+        for lot in reader:
+            colonnes_py = []
+            for col in colonnes:
+                valeurs = lot.column(col).to_pylist()
+                if colonnes_types[col] == "decimal":
+                    valeurs = [Decimal(val) if val is not None else None for val in valeurs]
+                colonnes_py.append(valeurs)
+            yield list(zip(*colonnes_py))
+
+def lire_lots_convertis(fichier_csv, colonnes, colonnes_types, taille_lot=5000):
+    """
+    Lit le CSV (ou le JSON) par blocs et renvoie des listes de tuples prêts à insérer.
+    Utilise le lecteur CSV natif de pyarrow quand il est installé, sinon les
+    convertisseurs par colonne en Python.
+    """
+    if pacsv is not None and not est_json(fichier_csv):
+        return _lots_arrow(fichier_csv, colonnes, colonnes_types, taille_lot)
+    return _lots_python(fichier_csv, colonnes, colonnes_types, taille_lot)
+
 def inserer_csv(session, keyspace, table_name, colonnes, fichier_csv, colonnes_types):
     """
     Insère les données du CSV dans la table Cassandra.
@@ -70,62 +311,116 @@ def inserer_csv(session, keyspace, table_name, colonnes, fichier_csv, colonnes_t
     query = f"INSERT INTO {keyspace}.{table_name} ({cols_str}) VALUES ({placeholders})"
     prepared = session.prepare(query)
 
-    with open(fichier_csv, newline='', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            valeurs = []
-            for col in colonnes:
-                val = row[col]
-                if val == '':
-                    val = None
-                elif colonnes_types[col] == "boolean":
-                    val = val.lower() == "true"
-                elif colonnes_types[col] == "int":
-                    try:
-                        val = int(val)
-                    except:
-                        val = None
-                elif colonnes_types[col] == "date":
-                    try:
-                        val = datetime.strptime(val, "%Y-%m-%d").date()
-                    except:
-                        val = None
-                else:  # text
-                    val = str(val) if val is not None else None
-                valeurs.append(val)
-            session.execute(prepared, tuple(valeurs))
-
-def traiter_repertoire(session, keyspace, dossier):
+    for lignes in lire_lots_convertis(fichier_csv, colonnes, colonnes_types):
+        for valeurs in lignes:
+            session.execute(prepared, valeurs)
+
+def inserer_csv_concurrent(session, keyspace, table_name, colonnes, fichier_csv, colonnes_types,
+                           en_vol=100, taille_lot=5000, batch_par_replique=False, lignes_par_batch=50,
+                           max_tentatives=5):
+    """
+    Chargement haut débit du CSV :
+    - `en_vol` : nombre maximal de requêtes simultanées (execute_concurrent)
+    - `taille_lot` : lignes lues et envoyées par vague, pour garder une mémoire bornée
+    - `batch_par_replique` : regroupe les lignes dont la partition a la même réplique
+      primaire dans des BATCH UNLOGGED d'au plus `lignes_par_batch` lignes (sans coût de
+      batchlog) ; le batch est routé vers cette réplique, qui écrit localement au lieu de
+      relayer chaque ligne. La clé de partition est celle de la table côté serveur
+      (routing key du statement préparé), pas une colonne supposée
+    - en cas de timeout d'écriture, la vague fautive est rejouée après une pause
+      croissante et `en_vol` est divisé par deux (back-pressure)
+    Retourne le nombre de lignes insérées.
+    """
+    cols_str = ", ".join(colonnes)
+    placeholders = ", ".join(["?"] * len(colonnes))
+    prepared = session.prepare(f"INSERT INTO {keyspace}.{table_name} ({cols_str}) VALUES ({placeholders})")
+    metadata = session.cluster.metadata
+
+    def statements(lignes):
+        """Paires (statement, paramètres) à envoyer pour une vague de lignes."""
+        if not batch_par_replique:
+            return [(prepared, valeurs) for valeurs in lignes]
+        groupes = {}
+        for valeurs in lignes:
+            bound = prepared.bind(valeurs)
+            # routing_key : valeur(s) de la clé de partition réelle, sérialisée(s) par le driver
+            repliques = metadata.get_replicas(keyspace, bound.routing_key) if bound.routing_key else []
+            groupes.setdefault(repliques[0] if repliques else None, []).append(bound)
+        batches = []
+        for groupe in groupes.values():
+            for debut in range(0, len(groupe), lignes_par_batch):
+                batch = BatchStatement(batch_type=BatchType.UNLOGGED)
+                for bound in groupe[debut:debut + lignes_par_batch]:
+                    batch.add(bound)
+                batches.append((batch, None))
+        return batches
+
+    def envoyer(lignes):
+        nonlocal en_vol
+        a_envoyer = statements(lignes)
+        for tentative in range(max_tentatives):
+            resultats = execute_concurrent(session, a_envoyer, concurrency=en_vol, raise_on_first_error=False)
+            echecs = [(envoi, res) for envoi, (ok, res) in zip(a_envoyer, resultats) if not ok]
+            if not echecs:
+                return
+            for _, res in echecs:
+                if not isinstance(res, (WriteTimeout, OperationTimedOut)):
+                    raise res
+            # Back-pressure : moins de requêtes en vol, pause, puis on rejoue uniquement les échecs
+            en_vol = max(1, en_vol // 2)
+            print(f"⚠️ {len(echecs)} timeouts d'écriture, nouvelle tentative avec {en_vol} requêtes en vol")
+            time.sleep(0.5 * 2 ** tentative)
+            a_envoyer = [envoi for envoi, _ in echecs]
+        raise RuntimeError(f"Échec d'insertion dans {table_name} après {max_tentatives} tentatives")
+
+    nb_lignes = 0
+    debut = time.perf_counter()
+    for lignes in lire_lots_convertis(fichier_csv, colonnes, colonnes_types, taille_lot):
+        envoyer(lignes)
+        nb_lignes += len(lignes)
+
+    duree = time.perf_counter() - debut
+    debit = nb_lignes / duree if duree else 0
+    print(f"🚀 {nb_lignes} lignes insérées dans {table_name} en {duree:.1f}s ({debit:.0f} lignes/s)")
+    return nb_lignes
+
+def traiter_repertoire(session, keyspace, dossier, concurrent=False, inference_complete=False,
+                       extensions=('.csv',), **options_chargement):
     """
     Lit tous les CSV du dossier, crée une table par CSV et insère les données.
+    `concurrent=True` utilise inserer_csv_concurrent (options : en_vol, taille_lot, batch_par_replique, lignes_par_batch).
+    `inference_complete=True` détermine les types sur tout le fichier au lieu des 10 premières lignes.
+    `extensions` : ajouter '.json' (ou '.ndjson', '.jsonl') pour charger aussi les exports JSON.
     """
-    fichiers = [f for f in os.listdir(dossier) if f.endswith('.csv')]
+    fichiers = [f for f in os.listdir(dossier) if f.lower().endswith(tuple(extensions))]
     for fichier in fichiers:
         path = os.path.join(dossier, fichier)
-        table_name = os.path.splitext(fichier)[0]
+        table_name = nom_cql(os.path.splitext(fichier)[0])
         print(f"\n📂 Traitement du fichier {fichier} → table {table_name} ...")
 
-        # Lire colonnes + échantillon
-        with open(path, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            colonnes = reader.fieldnames
-            echantillon = {col: [] for col in colonnes}
-            for i, row in enumerate(reader):
-                if i >= 10:
-                    break
-                for col in colonnes:
-                    echantillon[col].append(row[col])
-
-        # Déterminer les types
-        colonnes_types = {}
-        for col in colonnes:
-            colonnes_types[col] = deviner_type_colonne(col, echantillon[col])
+        if inference_complete:
+            colonnes, colonnes_types = inferer_types_fichier(path)
+        else:
+            # Lire colonnes + échantillon
+            blocs = blocs_bruts(path, 10)
+            colonnes = next(blocs)
+            lignes = next(blocs, [])
+            blocs.close()
+            echantillon = {col: [row[i] for row in lignes] for i, col in enumerate(colonnes)}
+
+            # Déterminer les types
+            colonnes_types = {}
+            for col in colonnes:
+                colonnes_types[col] = deviner_type_colonne(col, echantillon[col])
 
         # Créer la table
-        creer_table_dyn(session, keyspace, table_name, colonnes_types)
+        creer_table_dyn(session, keyspace, table_name, colonnes_types, forcer_cle_int=not inference_complete)
 
         # Insérer les données
-        inserer_csv(session, keyspace, table_name, colonnes, path, colonnes_types)
+        if concurrent:
+            inserer_csv_concurrent(session, keyspace, table_name, colonnes, path, colonnes_types, **options_chargement)
+        else:
+            inserer_csv(session, keyspace, table_name, colonnes, path, colonnes_types)
 
         print(f"✅ Table {table_name} remplie avec succès.")
 
@@ -135,4 +430,4 @@ if __name__ == "__main__":
     session = cluster.connect('education')  # keyspace existant
 
     dossier_csv = '/home/dev47/Bureau/data_flow_360/data_sources/generators/Ibrahima47/scraped_data'
-    traiter_repertoire(session, 'education', dossier_csv)
+    traiter_repertoire(session, 'education', dossier_csv, concurrent=True, inference_complete=True, en_vol=100)
@@ -0,0 +1,40 @@
+import json
+import os
+import threading
+from datetime import date, datetime
+
+# ========================
+# État des exports incrémentaux
+# ========================
+class EtatExport:
+    """
+    Hauts niveaux (watermarks) par table, persistés dans un petit fichier JSON :
+    {"mysql:education.presence": {"colonne": "id_presence", "valeur": 1234, "maj": "..."}}
+    """
+
+    def __init__(self, chemin="etat_export.json"):
+        self.chemin = chemin
+        self._lock = threading.Lock()
+        self._etat = {}
+        if os.path.exists(chemin):
+            with open(chemin, encoding="utf-8") as f:
+                self._etat = json.load(f)
+
+    def get(self, cle, colonne):
+        """Dernière valeur exportée pour `cle`, ou None si la colonne de suivi a changé."""
+        with self._lock:
+            entree = self._etat.get(cle)
+        if entree and entree["colonne"] == colonne:
+            return entree["valeur"]
+        return None
+
+    def set(self, cle, colonne, valeur):
+        if isinstance(valeur, (datetime, date)):
+            valeur = valeur.isoformat(sep=" ") if isinstance(valeur, datetime) else valeur.isoformat()
+        with self._lock:
+            self._etat[cle] = {"colonne": colonne, "valeur": valeur, "maj": datetime.now().isoformat(timespec="seconds")}
+            # Écriture atomique : un export interrompu ne corrompt pas l'état
+            tmp = f"{self.chemin}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._etat, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.chemin)
@@ -0,0 +1,682 @@
+import contextlib
+import csv
+import decimal
+import gzip
+import hashlib
+import io
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow n'est requis que pour le format parquet
+    pa = None
+    pq = None
+
+try:
+    import orjson
+except ImportError:  # encodeur NDJSON rapide optionnel, json de la bibliothèque standard sinon
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # requis uniquement pour le format ndjson.zst
+    zstandard = None
+
+# ========================
+# Lecture par lots
+# ========================
+def iter_batches(cursor, batch_size=10000):
+    """Parcourt un curseur DB-API par lots de `batch_size` lignes (fetchmany)."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield rows
+
+def chunked(records, batch_size=10000):
+    """Regroupe un itérable quelconque (résultat Cassandra, curseur Mongo, Neo4j) en lots."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# ========================
+# Sinks (formats de sortie)
+# ========================
+# Un sink reçoit les lots d'un même flux et les écrit dans un fichier HDFS.
+# Une ligne est soit une séquence alignée sur `columns`, soit un dict (documents Mongo).
+
+@contextlib.contextmanager
+def _ecriture(client, chemin, overwrite, encoding=None):
+    """client.write ; si l'export est interrompu (ExportInterrompu), le fichier partiel est supprimé."""
+    try:
+        with client.write(chemin, encoding=encoding, overwrite=overwrite) as writer:
+            yield writer
+    except ExportInterrompu:
+        client.delete(chemin)
+        raise
+
+class CsvSink:
+    extension = "csv"
+
+    def __init__(self, client, chemin, columns, overwrite=True):
+        self.client = client
+        self.chemin = chemin
+        self.columns = list(columns)
+        self.overwrite = overwrite
+
+    def write(self, batches):
+        with _ecriture(self.client, self.chemin, self.overwrite, encoding="utf-8") as writer:
+            csv_writer = csv.writer(writer)
+            csv_writer.writerow(self.columns)
+            for rows in batches:
+                if rows and isinstance(rows[0], dict):
+                    rows = [[row.get(k, "") for k in self.columns] for row in rows]
+                csv_writer.writerows(rows)
+
+class JsonSink:
+    extension = "json"
+
+    def __init__(self, client, chemin, columns, overwrite=True):
+        self.client = client
+        self.chemin = chemin
+        self.columns = list(columns)
+        self.overwrite = overwrite
+
+    def write(self, batches):
+        with _ecriture(self.client, self.chemin, self.overwrite, encoding="utf-8") as writer:
+            writer.write("[")
+            first = True
+            for rows in batches:
+                for row in rows:
+                    if not isinstance(row, dict):
+                        row = dict(zip(self.columns, row))
+                    if not first:
+                        writer.write(",")
+                    writer.write(json.dumps(row, default=str))
+                    first = False
+            writer.write("]")
+
+# ========================
+# NDJSON (un document par ligne, découpable)
+# ========================
+# Contrairement au tableau JSON, un fichier NDJSON se lit ligne à ligne et se découpe
+# en blocs indépendants pour un traitement parallèle (Spark, Hive...). Chaque lot est
+# encodé en bytes (orjson si installé) puis envoyé en une seule écriture binaire.
+
+def _defaut_json(valeur):
+    # Dates en ISO 8601 (comme orjson), Decimal / ObjectId / UUID en texte
+    if hasattr(valeur, "isoformat"):
+        return valeur.isoformat()
+    return str(valeur)
+
+if orjson is not None:
+    _OPTIONS_ORJSON = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+
+    def ligne_ndjson(document):
+        return orjson.dumps(document, default=_defaut_json, option=_OPTIONS_ORJSON)
+else:
+    _encodeur = json.JSONEncoder(default=_defaut_json, ensure_ascii=False, separators=(",", ":"))
+
+    def ligne_ndjson(document):
+        return (_encodeur.encode(document) + "\n").encode("utf-8")
+
+def _compresseur(writer, compression):
+    if compression is None:
+        return contextlib.nullcontext(writer)
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=writer, mode="wb", compresslevel=6)
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstandard est requis pour le format ndjson.zst (pip install zstandard)")
+        return zstandard.ZstdCompressor(level=3).stream_writer(writer, closefd=False)
+    raise ValueError(f"Compression inconnue : {compression}")
+
+class NdjsonSink:
+    extension = "ndjson"
+    compression = None
+
+    def __init__(self, client, chemin, columns, overwrite=True):
+        self.client = client
+        self.chemin = chemin
+        self.columns = list(columns)
+        self.overwrite = overwrite
+
+    def write(self, batches):
+        with _ecriture(self.client, self.chemin, self.overwrite) as writer:
+            with _compresseur(writer, self.compression) as sortie:
+                for rows in batches:
+                    if rows and not isinstance(rows[0], dict):
+                        rows = [dict(zip(self.columns, row)) for row in rows]
+                    sortie.write(b"".join(map(ligne_ndjson, rows)))
+
+class NdjsonGzipSink(NdjsonSink):
+    extension = "ndjson.gz"
+    compression = "gzip"
+
+class NdjsonZstdSink(NdjsonSink):
+    extension = "ndjson.zst"
+    compression = "zstd"
+
+def lire_ndjson(reader, extension="ndjson"):
+    """Relit un flux binaire NDJSON (éventuellement .gz / .zst) document par document."""
+    if extension.endswith(".gz"):
+        reader = gzip.GzipFile(fileobj=reader, mode="rb")
+    elif extension.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("zstandard est requis pour relire un fichier .zst")
+        reader = zstandard.ZstdDecompressor().stream_reader(reader)
+    charger = orjson.loads if orjson is not None else json.loads
+    reste = b""
+    while True:
+        bloc = reader.read(1 << 20)
+        if not bloc:
+            break
+        lignes = (reste + bloc).split(b"\n")
+        reste = lignes.pop()
+        for ligne in lignes:
+            if ligne.strip():
+                yield charger(ligne)
+    if reste.strip():
+        yield charger(reste)
+
+# ========================
+# Parquet (colonnes, un row group par lot)
+# ========================
+# Types Arrow désignés par nom, pour que les correspondances restent utilisables sans pyarrow.
+# None = type inféré à partir du premier lot. "decimal" = decimal128 à la précision et à
+# l'échelle de la colonne (cursor.description), texte si elles sont inconnues : jamais de
+# float64, qui arrondirait les montants.
+
+# OID PostgreSQL (cursor.description[i].type_code)
+POSTGRES_ARROW_TYPES = {
+    16: "bool", 20: "int64", 21: "int16", 23: "int32",
+    700: "float32", 701: "float64", 1700: "decimal",
+    25: "string", 1042: "string", 1043: "string",
+    1082: "date32", 1114: "timestamp", 1184: "timestamp",
+}
+
+# mysql.connector FieldType (cursor.description[i][1])
+MYSQL_ARROW_TYPES = {
+    0: "decimal", 246: "decimal", 1: "int8", 2: "int16", 3: "int32", 8: "int64", 9: "int32",
+    4: "float32", 5: "float64", 10: "date32", 7: "timestamp", 12: "timestamp", 13: "int16",
+    15: "string", 247: "string", 253: "string", 254: "string",
+}
+
+# system_schema.columns.type
+CASSANDRA_ARROW_TYPES = {
+    "boolean": "bool", "tinyint": "int8", "smallint": "int16", "int": "int32", "bigint": "int64",
+    "varint": "int64", "counter": "int64", "float": "float32", "double": "float64", "decimal": "string",
+    "text": "string", "varchar": "string", "ascii": "string", "uuid": "string", "timeuuid": "string",
+    "inet": "string", "date": "date32", "timestamp": "timestamp",
+}
+
+def _type_decimal(desc):
+    """decimal128(p,s) d'après precision / scale de la description DB-API, sinon texte."""
+    precision, scale = (desc[4], desc[5]) if len(desc) > 5 else (None, None)
+    # NUMERIC sans précision (PostgreSQL), description sans précision (mysql.connector)
+    if not precision or scale is None or not 0 <= scale <= precision <= 38:
+        return "string"
+    return f"decimal128({precision},{scale})"
+
+def types_from_description(description, correspondance):
+    """Types Arrow (par nom) d'après `cursor.description` et une table de correspondance."""
+    types = []
+    for desc in description:
+        nom = correspondance.get(desc[1])
+        types.append(_type_decimal(desc) if nom == "decimal" else nom)
+    return types
+
+def _arrow_type(nom):
+    if nom is None:
+        return None
+    if nom == "timestamp":
+        return pa.timestamp("us")
+    if nom.startswith("decimal128("):
+        precision, scale = nom[len("decimal128("):-1].split(",")
+        return pa.decimal128(int(precision), int(scale))
+    if nom == "decimal":
+        return pa.string()
+    return getattr(pa, nom)()
+
+def _convertisseur(type_):
+    if pa.types.is_string(type_):
+        return lambda v: json.dumps(v, default=str) if isinstance(v, (dict, list)) else str(v)
+    if pa.types.is_floating(type_):
+        return float
+    if pa.types.is_decimal(type_):
+        # Arrondi à l'échelle de la colonne (les Decimal plus précis sont refusés par pyarrow)
+        quantum = decimal.Decimal(1).scaleb(-type_.scale)
+        return lambda v: decimal.Decimal(str(v)).quantize(quantum)
+    if pa.types.is_integer(type_):
+        return int
+    if pa.types.is_date(type_):
+        return lambda v: v.date()  # cassandra.util.Date
+    return None
+
+def _colonne_arrow(values, type_):
+    try:
+        return pa.array(values, type=type_)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        conv = _convertisseur(type_)
+        if conv is None:
+            raise
+        return pa.array([None if v is None else conv(v) for v in values], type=type_)
+
+def _inferer_type(values):
+    try:
+        type_ = pa.array(values).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError, TypeError, ValueError):
+        return pa.string()
+    # Colonnes vides ou imbriquées (sous-documents Mongo, propriétés Neo4j) : texte
+    if pa.types.is_null(type_) or pa.types.is_nested(type_):
+        return pa.string()
+    return type_
+
+class ParquetSink:
+    """
+    Écrit un fichier Parquet en streaming : chaque lot devient un row group,
+    avec encodage dictionnaire par colonne et compression.
+    """
+    extension = "parquet"
+
+    def __init__(self, client, chemin, columns, overwrite=True, types=None, compression="snappy"):
+        if pa is None:
+            raise ImportError("pyarrow est requis pour le format parquet (pip install pyarrow)")
+        self.client = client
+        self.chemin = chemin
+        self.columns = list(columns)
+        self.overwrite = overwrite
+        self.types = list(types) if types else [None] * len(self.columns)
+        self.compression = compression
+
+    def _colonnes(self, rows):
+        if isinstance(rows[0], dict):
+            return [[row.get(k) for row in rows] for k in self.columns]
+        return [list(col) for col in zip(*rows)]
+
+    def write(self, batches):
+        with _ecriture(self.client, self.chemin, self.overwrite) as writer:
+            parquet_writer = None
+            schema = None
+            for rows in batches:
+                if not rows:
+                    continue
+                colonnes = self._colonnes(rows)
+                if schema is None:
+                    schema = pa.schema([
+                        (nom, _arrow_type(type_) or _inferer_type(values))
+                        for nom, type_, values in zip(self.columns, self.types, colonnes)
+                    ])
+                    parquet_writer = pq.ParquetWriter(writer, schema, compression=self.compression,
+                                                      use_dictionary=True)
+                arrays = [_colonne_arrow(values, field.type) for values, field in zip(colonnes, schema)]
+                parquet_writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+            if parquet_writer is None:
+                # Table vide : fichier valide avec le schéma connu (texte par défaut)
+                schema = pa.schema([(nom, _arrow_type(type_) or pa.string())
+                                    for nom, type_ in zip(self.columns, self.types)])
+                parquet_writer = pq.ParquetWriter(writer, schema, compression=self.compression)
+            parquet_writer.close()
+
+SINKS = {
+    "csv": CsvSink,
+    "json": JsonSink,
+    "ndjson": NdjsonSink,
+    "ndjson.gz": NdjsonGzipSink,
+    "ndjson.zst": NdjsonZstdSink,
+    "parquet": ParquetSink,
+}
+
+def make_sinks(client, chemin_base, columns, formats=("csv", "json"), overwrite=True, types=None):
+    """Instancie un sink par format : `{chemin_base}.{extension}`. `types` ne sert qu'au parquet."""
+    sinks = []
+    for fmt in formats:
+        classe = SINKS[fmt]
+        chemin = f"{chemin_base}.{classe.extension}"
+        if classe is ParquetSink:
+            sinks.append(classe(client, chemin, columns, overwrite=overwrite, types=types))
+        else:
+            sinks.append(classe(client, chemin, columns, overwrite=overwrite))
+    return sinks
+
+# ========================
+# Documents hétérogènes : union de schéma en part-files
+# ========================
+# Les documents Mongo (ou JSON d'API) n'ont pas tous les mêmes clés (`justifie` seulement
+# sur les absences) et contiennent des sous-documents (`eleve`, `cours`). Au lieu de figer
+# les colonnes sur le premier document, on aplatit les sous-documents en colonnes pointées
+# et on ouvre un nouveau part-file, avec le schéma élargi, dès qu'une clé inconnue apparaît.
+
+def aplatir(document, prefixe="", sep="."):
+    """
+    {"eleve": {"id_eleve": 3, "nom": "Ba"}, "notes": [12, 14]}
+    -> {"eleve.id_eleve": 3, "eleve.nom": "Ba", "notes": "[12, 14]"}
+    Les listes sont sérialisées en JSON (une cellule par valeur).
+    """
+    plat = {}
+    for cle, valeur in document.items():
+        nom = f"{prefixe}{cle}"
+        if isinstance(valeur, dict) and valeur:
+            plat.update(aplatir(valeur, f"{nom}{sep}", sep))
+        elif isinstance(valeur, (dict, list, tuple)):
+            plat[nom] = json.dumps(valeur, default=str, ensure_ascii=False)
+        else:
+            plat[nom] = valeur
+    return plat
+
+def union_colonnes(colonnes, documents):
+    """Ajoute à `colonnes` (ordre d'apparition conservé) les clés inconnues de `documents`."""
+    connues = set(colonnes)
+    for document in documents:
+        for cle in document:
+            if cle not in connues:
+                connues.add(cle)
+                colonnes.append(cle)
+    return colonnes
+
+class SchemaUnionSink:
+    """
+    Écrit des documents (dicts, éventuellement imbriqués) en une seule passe dans
+    `{chemin_base}.{ext}/part-NNNNN.{ext}` (CSV ou Parquet), un dossier par format :
+    - le schéma d'un part-file est l'union des clés aplaties de son premier lot ;
+    - un document apportant une clé inconnue ferme le part-file et en ouvre un nouveau
+      dont le schéma est l'union élargie (les clés absentes d'un document restent vides) ;
+    - `{chemin_base}.{ext}/_schema.json` décrit l'union finale et les colonnes de chaque part-file.
+    Seul le lot en cours est en mémoire.
+    """
+
+    def __init__(self, client, chemin_base, format="csv", overwrite=True, batch_size=10000):
+        self.classe = SINKS[format]
+        self.extension = self.classe.extension
+        self.client = client
+        self.dossier = f"{chemin_base}.{self.extension}"
+        self.overwrite = overwrite
+        self.batch_size = batch_size
+
+    def write(self, batches):
+        # Dossier propre à ce format : les sinks d'un même fan_out ne s'effacent pas entre eux
+        if self.overwrite and self.client.status(self.dossier, strict=False) is not None:
+            self.client.delete(self.dossier, recursive=True)  # pas de part-files d'un export précédent
+        documents = (aplatir(doc) for rows in batches for doc in rows)
+        colonnes = []
+        parts = []
+        suivant = next(documents, None)
+        while suivant is not None:
+            # Schéma du part-file : union des clés d'un premier lot lu d'avance
+            tete = [suivant] + list(itertools.islice(documents, self.batch_size - 1))
+            suivant = next(documents, None)
+            union_colonnes(colonnes, tete)
+            colonnes_part = list(colonnes)
+            connues = set(colonnes_part)
+            nb = [0]
+
+            def lots():
+                nonlocal suivant
+                nb[0] += len(tete)
+                yield tete
+                lot = []
+                while suivant is not None and suivant.keys() <= connues:
+                    lot.append(suivant)
+                    suivant = next(documents, None)
+                    if len(lot) >= self.batch_size:
+                        nb[0] += len(lot)
+                        yield lot
+                        lot = []
+                if lot:
+                    nb[0] += len(lot)
+                    yield lot
+
+            fichier = f"part-{len(parts):05d}.{self.extension}"
+            self.classe(self.client, f"{self.dossier}/{fichier}", colonnes_part,
+                        overwrite=self.overwrite).write(lots())
+            parts.append({"fichier": fichier, "colonnes": colonnes_part, "lignes": nb[0]})
+
+        manifeste = {"colonnes": colonnes, "parts": parts}
+        self.client.write(f"{self.dossier}/_schema.json",
+                          data=json.dumps(manifeste, ensure_ascii=False, indent=2),
+                          encoding="utf-8", overwrite=True)
+
+def make_union_sinks(client, chemin_base, formats=("csv", "json"), overwrite=True, batch_size=10000):
+    """
+    Sinks pour documents hétérogènes : SchemaUnionSink pour csv/parquet (dossier
+    `{chemin_base}.{extension}/`) ; JSON et NDJSON gardent les documents tels quels
+    (imbrication comprise) dans le fichier `{chemin_base}.{extension}`.
+    """
+    sinks = []
+    for fmt in formats:
+        classe = SINKS[fmt]
+        if classe is JsonSink or issubclass(classe, NdjsonSink):
+            sinks.append(classe(client, f"{chemin_base}.{classe.extension}", [], overwrite=overwrite))
+        else:
+            sinks.append(SchemaUnionSink(client, chemin_base, fmt, overwrite=overwrite, batch_size=batch_size))
+    return sinks
+
+# ========================
+# Part-files à taille bornée (rollover)
+# ========================
+# Une grosse table n'est plus un seul flux WebHDFS : les lignes sont encodées par le sink du
+# format dans un fichier local temporaire, qui devient `part-NNNNN` dès `max_lignes` lignes
+# ou `max_octets` octets. Chaque part-file est envoyé (avec nouvelles tentatives) pendant
+# l'encodage du suivant ; un échec d'envoi ne rejoue que ce part-file, pas la table.
+
+class _ClientLocal:
+    """Client minimal (interface de client.write) écrivant dans un fichier local."""
+
+    def __init__(self, chemin):
+        self.chemin = chemin
+
+    def delete(self, chemin):
+        pass  # le fichier local est supprimé par RollingSink
+
+    @contextlib.contextmanager
+    def write(self, chemin, encoding=None, overwrite=True):
+        with open(self.chemin, "wb") as f:
+            if encoding is None:
+                yield f
+            else:
+                texte = io.TextIOWrapper(f, encoding=encoding, newline="")
+                yield texte
+                texte.flush()
+                texte.detach()
+
+def _sha256(chemin):
+    empreinte = hashlib.sha256()
+    with open(chemin, "rb") as f:
+        for bloc in iter(lambda: f.read(1 << 20), b""):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+class RollingSink:
+    """
+    Écrit `{chemin_base}.{extension}/part-NNNNN.{extension}` (même format que SINKS[format]),
+    puis `_manifest.json` (lignes, octets et sha256 par part-file) et enfin `_SUCCESS`,
+    seulement si la source a été lue jusqu'au bout et tous les part-files envoyés.
+    `overwrite=False` refuse un dossier existant au lieu de le remplacer.
+    """
+
+    def __init__(self, client, chemin_base, columns, format="csv", overwrite=True, types=None,
+                 max_lignes=None, max_octets=128 << 20, tentatives=3, backoff=1.0, dossier_local=None):
+        self.classe = SINKS[format]
+        self.extension = self.classe.extension
+        self.client = client
+        self.dossier = f"{chemin_base}.{self.extension}"
+        self.columns = list(columns)
+        self.overwrite = overwrite
+        self.types = types
+        self.max_lignes = max_lignes
+        self.max_octets = max_octets
+        self.tentatives = tentatives
+        self.backoff = backoff
+        self.dossier_local = dossier_local
+
+    def _sink_local(self, chemin_local):
+        client = _ClientLocal(chemin_local)
+        if self.classe is ParquetSink:
+            return self.classe(client, chemin_local, self.columns, types=self.types)
+        return self.classe(client, chemin_local, self.columns)
+
+    def _envoyer(self, chemin_local, fichier, lignes):
+        """Envoie un part-file local dans HDFS, avec backoff exponentiel ; le supprime ensuite."""
+        try:
+            for tentative in range(self.tentatives):
+                try:
+                    # overwrite=True : le dossier appartient à cet export (cf. write), et une
+                    # tentative précédente a pu laisser un part-file partiel
+                    with open(chemin_local, "rb") as f:
+                        self.client.write(f"{self.dossier}/{fichier}", data=f, overwrite=True)
+                    break
+                except Exception as e:
+                    if tentative == self.tentatives - 1:
+                        raise
+                    print(f"[WARN] {self.dossier}/{fichier} : {e}, nouvelle tentative")
+                    time.sleep(self.backoff * 2 ** tentative)
+            return {"fichier": fichier, "lignes": lignes, "octets": os.path.getsize(chemin_local),
+                    "sha256": _sha256(chemin_local)}
+        finally:
+            os.remove(chemin_local)
+
+    def write(self, batches):
+        if self.client.status(self.dossier, strict=False) is not None:
+            if not self.overwrite:
+                raise FileExistsError(f"{self.dossier} existe déjà (overwrite=False)")
+            self.client.delete(self.dossier, recursive=True)  # pas de part-files d'un export précédent
+
+        lots = iter(batches)
+        suivant = next(lots, None)
+        parts = []
+        envoi = None
+        premier = True  # une table vide donne tout de même un part-file (en-tête, schéma)
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            while premier or suivant is not None:
+                premier = False
+                fd, chemin_local = tempfile.mkstemp(suffix=f".{self.extension}", dir=self.dossier_local)
+                os.close(fd)
+                nb = [0]
+
+                def lots_part():
+                    nonlocal suivant
+                    while suivant is not None:
+                        rows = suivant
+                        if self.max_lignes and nb[0] + len(rows) > self.max_lignes:
+                            # Le reste du lot ouvrira le part-file suivant
+                            coupe = self.max_lignes - nb[0]
+                            rows, suivant = rows[:coupe], rows[coupe:]
+                        else:
+                            suivant = next(lots, None)
+                        nb[0] += len(rows)
+                        yield rows
+                        if self.max_lignes and nb[0] >= self.max_lignes:
+                            return
+                        if self.max_octets and os.path.getsize(chemin_local) >= self.max_octets:
+                            return
+
+                try:
+                    self._sink_local(chemin_local).write(lots_part())
+                except BaseException:
+                    os.remove(chemin_local)
+                    raise
+                # Un seul envoi en cours : attendre le précédent avant de lancer celui-ci
+                if envoi is not None:
+                    try:
+                        parts.append(envoi.result())
+                    except BaseException:
+                        os.remove(chemin_local)
+                        raise
+                envoi = pool.submit(self._envoyer, chemin_local, f"part-{len(parts):05d}.{self.extension}", nb[0])
+            if envoi is not None:
+                parts.append(envoi.result())
+
+        manifeste = {"format": self.extension, "colonnes": self.columns,
+                     "lignes": sum(part["lignes"] for part in parts), "parts": parts}
+        self.client.write(f"{self.dossier}/_manifest.json", data=json.dumps(manifeste, indent=2),
+                          encoding="utf-8", overwrite=True)
+        self.client.write(f"{self.dossier}/_SUCCESS", data=b"", overwrite=True)
+
+def make_rolling_sinks(client, chemin_base, columns, formats=("csv", "ndjson"), overwrite=True, types=None,
+                       max_lignes=None, max_octets=128 << 20):
+    """Comme make_sinks, mais un dossier de part-files par format : `{chemin_base}.{extension}/`."""
+    return [RollingSink(client, chemin_base, columns, fmt, overwrite=overwrite, types=types,
+                        max_lignes=max_lignes, max_octets=max_octets) for fmt in formats]
+
+# ========================
+# Fan-out : une lecture, plusieurs sorties
+# ========================
+_FIN = object()
+_ABANDON = object()
+
+class ExportInterrompu(Exception):
+    """Levée dans un sink quand la source ou un autre sink a échoué : le fichier ne doit pas être finalisé."""
+
+def _drain(file_lots):
+    while True:
+        rows = file_lots.get()
+        if rows is _FIN:
+            return
+        if rows is _ABANDON:
+            raise ExportInterrompu("lecture de la source interrompue")
+        yield rows
+
+def fan_out(batches, sinks, queue_size=4):
+    """
+    Consomme une seule fois le flux `batches` et alimente tous les `sinks` en parallèle.
+
+    Chaque sink écrit dans son propre thread à partir d'une file bornée (`queue_size` lots),
+    ce qui limite la mémoire et laisse la lecture source continuer pendant les écritures HDFS.
+    Si la source ou un sink échoue, les autres sinks reçoivent un abandon (ExportInterrompu
+    levée dans leur write) au lieu d'une fin normale : les sinks fichier (csv, json, ndjson,
+    parquet) suppriment leur fichier partiel, RollingSink et SchemaUnionSink n'écrivent ni
+    manifeste ni _SUCCESS. Le fichier du sink qui a lui-même échoué n'est pas nettoyé.
+    Retourne le nombre de lignes lues.
+    """
+    files = [queue.Queue(maxsize=queue_size) for _ in sinks]
+    erreurs = []
+
+    def run(sink, file_lots):
+        try:
+            sink.write(_drain(file_lots))
+        except ExportInterrompu:
+            pass
+        except Exception as e:
+            erreurs.append(e)
+            # Vider la file pour ne pas bloquer le producteur
+            while file_lots.get() not in (_FIN, _ABANDON):
+                pass
+
+    threads = [threading.Thread(target=run, args=(sink, f), daemon=True) for sink, f in zip(sinks, files)]
+    for t in threads:
+        t.start()
+
+    nb_lignes = 0
+    complet = False
+    try:
+        for rows in batches:
+            if erreurs:
+                break
+            nb_lignes += len(rows)
+            for f in files:
+                f.put(rows)
+        else:
+            complet = True
+    finally:
+        fin = _FIN if complet and not erreurs else _ABANDON
+        for f in files:
+            f.put(fin)
+        for t in threads:
+            t.join()
+
+    if erreurs:
+        raise erreurs[0]
+    return nb_lignes
@@ -1,6 +1,14 @@
 import requests
 from hdfs import InsecureClient
 import csv
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from hdfs_sinks import ParquetSink, aplatir, chunked, fan_out, make_union_sinks, union_colonnes
+from lecture_json import lots_reponse_json
 
 def recuperer_donnees(endpoint, token):
 
@@ -8,20 +16,163 @@ def recuperer_donnees(endpoint, token):
 
     return donnees.json()
 
-def stocke_data_datalake(client, chemin, contenue):
+def recuperer_donnees_par_lots(endpoint, token, taille_lot=10000):
+    """
+    Comme recuperer_donnees, mais la réponse est lue en flux et décodée au fil de l'eau :
+    génère des lots de `taille_lot` enregistrements sans charger tout le JSON en mémoire.
+    """
+    headers = {"Authorization": f"Bearer {token}", "Accept": ACCEPT_FLUX}
+    with requests.get(f"{url}/{endpoint}", headers=headers, stream=True) as reponse:
+        reponse.raise_for_status()
+        yield from lots_reponse_json(reponse, taille_lot)
+
+def stocke_data_datalake(client, chemin, contenue, format="csv", batch_size=10000):
     if not contenue:
         print(f"[WARN] Aucune donnée à écrire dans {chemin}")
         return
 
     try:
+        # Sous-documents aplatis (colonnes pointées) ; colonnes = union des clés de tous les
+        # enregistrements, déjà en mémoire : un seul fichier, aucune colonne perdue
+        lignes = [aplatir(ligne) for ligne in contenue]
+        colonnes = union_colonnes([], lignes)
+        if format == "parquet":
+            # Parquet : un row group par lot de `batch_size` enregistrements
+            ParquetSink(client, chemin, colonnes).write(chunked(lignes, batch_size))
+            print(f"[INFO] Données écrites dans {chemin}")
+            return
         with client.write(chemin, overwrite=True, encoding="utf-8") as writer:
-            writer_csv = csv.DictWriter(writer, fieldnames=contenue[0].keys())
+            writer_csv = csv.DictWriter(writer, fieldnames=colonnes)
             writer_csv.writeheader()
-            writer_csv.writerows(contenue)
+            writer_csv.writerows(lignes)
         print(f"[INFO] Données écrites dans {chemin}")
     except Exception as e:
         print(f"[ERROR] Erreur écriture HDFS : {e}")
 
+# NDJSON de préférence (une ligne par enregistrement), sinon tableau JSON lu incrémentalement
+ACCEPT_FLUX = "application/x-ndjson, application/json;q=0.9"
+
+# ========================
+# Client API : session poolée, pagination, requêtes concurrentes
+# ========================
+class ClientAPI:
+    """
+    Accès aux endpoints REST avec une session keep-alive partagée entre threads.
+
+    - pagination par décalage : `?skip=<offset>&limit=<taille_page>` (noms via `params_page`)
+    - au plus `concurrence` requêtes en vol, tous endpoints confondus
+    - nouvelles tentatives avec backoff exponentiel sur erreurs réseau, 429 et 5xx
+    """
+
+    def __init__(self, url, token, taille_page=1000, concurrence=8, pages_en_parallele=4,
+                 tentatives=5, backoff=0.5, params_page=("skip", "limit"), timeout=60):
+        self.url = url.rstrip("/")
+        self.taille_page = taille_page
+        self.pages_en_parallele = pages_en_parallele
+        self.params_page = params_page
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(concurrence)
+
+        retry = Retry(total=tentatives, backoff_factor=backoff, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=("GET",), respect_retry_after_header=True)
+        adapter = HTTPAdapter(pool_connections=concurrence, pool_maxsize=concurrence, max_retries=retry)
+        self.session = requests.Session()
+        self.session.headers["Authorization"] = f"Bearer {token}"
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, endpoint, params=None):
+        with self._slots:
+            reponse = self.session.get(f"{self.url}/{endpoint}", params=params, timeout=self.timeout)
+        reponse.raise_for_status()
+        return reponse.json()
+
+    def page(self, endpoint, numero, taille=None):
+        taille = taille or self.taille_page
+        offset, limit = self.params_page
+        return self.get(endpoint, {offset: numero * taille, limit: taille})
+
+    def pages(self, endpoint):
+        """
+        Génère les pages (listes d'enregistrements) d'un endpoint, dans l'ordre.
+        Les pages 0 et 1 sont lues seules : la longueur de la page 0 donne la taille réelle des
+        pages (un serveur peut plafonner `limit`). Une réponse plus longue que `taille_page`, ou
+        une page qui recommence comme la précédente (skip/limit ignorés), signale un endpoint non
+        paginé, rendu en une seule page. Les pages suivantes sont demandées par fenêtres de
+        `pages_en_parallele` ; la lecture s'arrête à la première page vide ou répétée.
+        """
+        precedente = self.page(endpoint, 0)
+        if not precedente:
+            return
+        yield precedente
+        if len(precedente) > self.taille_page:
+            return
+        taille = len(precedente)
+        # Page 1 seule : un endpoint qui ignore la pagination n'est téléchargé qu'une fois de plus
+        seconde = self.page(endpoint, 1, taille)
+        if not seconde or seconde[0] == precedente[0]:
+            return
+        yield seconde
+        precedente = seconde
+        numero = 2
+        with ThreadPoolExecutor(max_workers=self.pages_en_parallele) as pool:
+            while True:
+                fenetre = [pool.submit(self.page, endpoint, n, taille)
+                           for n in range(numero, numero + self.pages_en_parallele)]
+                for future in fenetre:
+                    lignes = future.result()
+                    if not lignes or lignes[0] == precedente[0]:
+                        for reste in fenetre:
+                            reste.cancel()
+                        return
+                    yield lignes
+                    precedente = lignes
+                numero += self.pages_en_parallele
+
+    def lots(self, endpoint, taille_lot=None):
+        """
+        Génère les enregistrements d'un endpoint non paginé par lots de `taille_lot`
+        (`taille_page` par défaut) : la réponse est décodée au fil de la lecture du flux.
+        """
+        with self._slots:
+            with self.session.get(f"{self.url}/{endpoint}", headers={"Accept": ACCEPT_FLUX},
+                                  stream=True, timeout=self.timeout) as reponse:
+                reponse.raise_for_status()
+                yield from lots_reponse_json(reponse, taille_lot or self.taille_page)
+
+def ingerer_endpoint(api, client, endpoint, chemin_base, formats=("csv",), pagine=True):
+    """
+    Écrit un endpoint dans HDFS page par page (part-files `{chemin_base}.csv/part-NNNNN.csv`,
+    `{chemin_base}.json`, cf. make_union_sinks) : seules les pages en cours de traitement sont
+    en mémoire. Retourne le nombre d'enregistrements.
+    `pagine=False` lit l'endpoint en une seule requête décodée en flux (ClientAPI.lots).
+    """
+    pages = api.pages(endpoint) if pagine else api.lots(endpoint)
+    premiere = next(pages, None)
+    if premiere is None:
+        print(f"[WARN] Aucune donnée à écrire pour {endpoint}")
+        return 0
+    # Enregistrements hétérogènes (clés tardives, sous-documents) : colonnes pointées, schéma élargi
+    sinks = make_union_sinks(client, chemin_base, formats)
+    return fan_out(itertools.chain([premiere], pages), sinks)
+
+def ingerer_endpoints(api, client, endpoints, chemin_principal, formats=("csv",), endpoints_en_parallele=4,
+                      pagine=True):
+    """Ingère plusieurs endpoints en parallèle ; retourne {endpoint: nb_enregistrements ou exception}"""
+    def ingerer(endpoint):
+        debut = time.perf_counter()
+        try:
+            nb = ingerer_endpoint(api, client, endpoint, f"{chemin_principal}{endpoint}_api", formats, pagine)
+        except Exception as e:
+            print(f"[ERROR] {endpoint} : {e}")
+            return e
+        duree = time.perf_counter() - debut
+        print(f"[INFO] {endpoint} : {nb} enregistrements en {duree:.1f}s")
+        return nb
+
+    with ThreadPoolExecutor(max_workers=endpoints_en_parallele) as pool:
+        return dict(zip(endpoints, pool.map(ingerer, endpoints)))
+
 if __name__=="__main__":
     url = "http://localhost:8000"
 
@@ -41,14 +192,11 @@ if __name__=="__main__":
     # region = recuperer_donnees("regions",token)
 
     endpoints = ["eleves", "enseignants", "notes", "presences", "matiere", "regions", "etablissements", "cours"]
-    data_map = {}
-
-    for endpoint in endpoints:
-        data_map[endpoint] = recuperer_donnees(endpoint, token)
 
     chemin_principal = "/data/datalake/API_thierno/"
 
-    for key, data in data_map.items():
-        stocke_data_datalake(client, chemin_principal + f"{key}_api.csv", data)
+    # Pages écrites dans HDFS au fil de la lecture, endpoints et pages récupérés en parallèle
+    api = ClientAPI(url, token)
+    ingerer_endpoints(api, client, endpoints, chemin_principal)
 
     print("[INFO] Terminé.")
\ No newline at end of file
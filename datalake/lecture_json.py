@@ -0,0 +1,132 @@
+import io
+import json
+
+from hdfs_sinks import chunked
+
+# ========================
+# Lecture incrémentale de JSON
+# ========================
+# Un tableau JSON `[{...}, {...}, ...]` (réponse d'API, export scrapé) ou du NDJSON
+# (un document par ligne) est lu morceau par morceau : seuls le tampon de lecture
+# et le lot en cours sont en mémoire, jamais le document entier.
+
+_ESPACES = " \t\r\n"
+_CHIFFRES = "0123456789.eE+-"
+
+def _texte(flux, encoding="utf-8"):
+    """Flux texte à partir d'un flux binaire (fichier 'rb', réponse HTTP brute)."""
+    if isinstance(flux, io.TextIOBase):
+        return flux
+    if isinstance(flux, (io.BufferedIOBase, io.RawIOBase)):
+        return io.TextIOWrapper(flux, encoding=encoding)
+    return io.TextIOWrapper(io.BufferedReader(flux), encoding=encoding)
+
+def _nombre_jusqua_la_fin(tampon, pos):
+    """Vrai si seuls des caractères de nombre suivent `pos` jusqu'à la fin du tampon."""
+    while pos < len(tampon):
+        if tampon[pos] not in _CHIFFRES:
+            return False
+        pos += 1
+    return True
+
+def iter_tableau_json(flux, taille_tampon=1 << 16):
+    """
+    Génère un à un les éléments d'un tableau JSON lu depuis `flux`.
+    Chaque élément est décodé par json (raw_decode) dès qu'il est complet dans le tampon.
+    """
+    flux = _texte(flux)
+    decodeur = json.JSONDecoder()
+    tampon = ""
+    pos = 0
+    fin_flux = False
+
+    def remplir():
+        nonlocal tampon, pos, fin_flux
+        morceau = flux.read(taille_tampon)
+        if not morceau:
+            fin_flux = True
+        # On ne garde que la partie non encore décodée
+        tampon = tampon[pos:] + morceau
+        pos = 0
+
+    def sauter_espaces():
+        nonlocal pos
+        while True:
+            while pos < len(tampon) and tampon[pos] in _ESPACES:
+                pos += 1
+            if pos < len(tampon) or fin_flux:
+                return
+            remplir()
+
+    sauter_espaces()
+    if pos >= len(tampon):
+        return  # flux vide
+    if tampon[pos] != "[":
+        raise ValueError(f"Tableau JSON attendu, trouvé {tampon[pos]!r}")
+    pos += 1
+    premier = True
+    while True:
+        sauter_espaces()
+        if pos >= len(tampon):
+            raise ValueError("Tableau JSON tronqué")
+        if tampon[pos] == "]":
+            return
+        if not premier:
+            if tampon[pos] != ",":
+                raise ValueError(f"',' attendue entre deux éléments, trouvé {tampon[pos]!r}")
+            pos += 1
+            sauter_espaces()
+        while True:
+            try:
+                element, fin = decodeur.raw_decode(tampon, pos)
+            except json.JSONDecodeError:
+                # Élément incomplet : lire la suite, sauf si le flux est terminé
+                if fin_flux:
+                    raise
+                remplir()
+                continue
+            if (not fin_flux and isinstance(element, (int, float)) and not isinstance(element, bool)
+                    and _nombre_jusqua_la_fin(tampon, fin)):
+                # Un nombre coupé en fin de tampon (123|456, -1.|5) se décode sans erreur en
+                # s'arrêtant trop tôt : relire avec la suite avant de l'accepter
+                remplir()
+                continue
+            pos = fin
+            break
+        premier = False
+        yield element
+
+def iter_ndjson(flux):
+    """Génère les documents d'un flux NDJSON (lignes vides ignorées)."""
+    for ligne in _texte(flux):
+        if ligne.strip():
+            yield json.loads(ligne)
+
+def est_ndjson(flux):
+    """Vrai si le flux texte (repositionnable) ne commence pas par un tableau JSON."""
+    debut = flux.read(1)
+    while debut and debut in _ESPACES:
+        debut = flux.read(1)
+    flux.seek(0)
+    return debut not in ("[", "")
+
+def lots_json(flux, taille_lot=10000, ndjson=False):
+    """Lots d'au plus `taille_lot` documents, depuis un tableau JSON ou du NDJSON."""
+    documents = iter_ndjson(flux) if ndjson else iter_tableau_json(flux)
+    return chunked(documents, taille_lot)
+
+def lots_fichier_json(chemin, taille_lot=10000):
+    """Lots de documents d'un fichier .json (tableau) ou .ndjson / .jsonl, détecté au contenu."""
+    with open(chemin, encoding="utf-8") as f:
+        yield from lots_json(f, taille_lot, ndjson=est_ndjson(f))
+
+def lots_reponse_json(reponse, taille_lot=10000):
+    """
+    Lots de documents d'une réponse requests ouverte avec stream=True :
+    NDJSON si le serveur l'annonce (Content-Type), sinon tableau JSON lu sur le flux brut.
+    """
+    if "ndjson" in reponse.headers.get("Content-Type", ""):
+        documents = (json.loads(ligne) for ligne in reponse.iter_lines() if ligne)
+        return chunked(documents, taille_lot)
+    reponse.raw.decode_content = True  # décompression gzip à la volée
+    return lots_json(io.TextIOWrapper(reponse.raw, encoding=reponse.encoding or "utf-8"), taille_lot)
@@ -0,0 +1,45 @@
+from insertion_data_lake import ClientAPI
+
+class FauxClientAPI(ClientAPI):
+    """ClientAPI sans réseau : `get` sert `donnees` selon skip/limit (ou les ignore)."""
+
+    def __init__(self, donnees, taille_page=100, plafond=None, ignore_pagination=False):
+        self.taille_page = taille_page
+        self.pages_en_parallele = 4
+        self.params_page = ("skip", "limit")
+        self.donnees = donnees
+        self.plafond = plafond
+        self.ignore_pagination = ignore_pagination
+        self.requetes = 0
+
+    def get(self, endpoint, params=None):
+        self.requetes += 1
+        if self.ignore_pagination:
+            return list(self.donnees)
+        limit = min(params["limit"], self.plafond or params["limit"])
+        return self.donnees[params["skip"]:params["skip"] + limit]
+
+def lire(api):
+    return [ligne for page in api.pages("eleves") for ligne in page]
+
+def test_pagination_complete():
+    donnees = [{"id": i} for i in range(345)]
+    assert lire(FauxClientAPI(donnees)) == donnees
+
+def test_limit_plafonne_par_le_serveur():
+    donnees = [{"id": i} for i in range(345)]
+    assert lire(FauxClientAPI(donnees, plafond=30)) == donnees
+
+def test_endpoint_non_pagine_de_taille_page():
+    donnees = [{"id": i} for i in range(100)]
+    api = FauxClientAPI(donnees, ignore_pagination=True)
+    assert lire(api) == donnees
+    assert api.requetes == 2
+
+def test_endpoint_non_pagine_court_ou_long():
+    for n in (40, 250):
+        donnees = [{"id": i} for i in range(n)]
+        assert lire(FauxClientAPI(donnees, ignore_pagination=True)) == donnees
+
+def test_endpoint_vide():
+    assert lire(FauxClientAPI([])) == []
@@ -1,5 +1,10 @@
 import uuid
+import weakref
+from array import array
+from collections import Counter
 from cassandra.cluster import Cluster
+from cassandra.concurrent import execute_concurrent
+from cassandra.query import BatchStatement, BatchType, SimpleStatement
 
 def creer_table(session, bd, nom_table, *attributs):
     session.set_keyspace(bd)
@@ -107,115 +112,281 @@ def creer_tables_systeme_educatif(session, bd):
         ("id_matiere", "UUID")  # Clé étrangère vers Matiere
     )
 
+    creer_tables_requetes(session, bd)
+
+# ===============================
+# TABLES DE REQUÊTE (DÉNORMALISATION)
+# ===============================
+# Une table par recherche "par clé étrangère", partitionnée par cette clé :
+# les extraire_*_par_* deviennent des lectures d'une seule partition au lieu
+# de scans ALLOW FILTERING sur tout le cluster.
+
+# table de base -> [(table de requête, colonnes de la clé primaire)]
+# Toutes les colonnes de la clé (partition et clustering) doivent être renseignées
+TABLES_REQUETES = {
+    "etablissement": [("etablissements_par_region", ("id_region", "id"))],
+    "enseignant": [("enseignants_par_etablissement", ("id_etablissement", "id"))],
+    "eleve": [("eleves_par_etablissement", ("id_etablissement", "id"))],
+    "cours": [("cours_par_enseignant", ("id_enseignant", "id"))],
+    "noter": [("notes_par_eleve", ("id_eleve", "id"))],
+    "presence": [("presences_par_eleve", ("id_eleve", "date_presence", "id"))],
+    "enseignement": [("enseignements_par_enseignant", ("id_enseignant", "id"))],
+}
+
+def creer_tables_requetes(session, bd):
+    """Crée les tables de requête, mêmes colonnes que la table de base avec une autre clé primaire"""
+
+    creer_table(session, bd, "etablissements_par_region",
+        ("id_region", "UUID"),
+        ("id", "INT"),
+        ("nom_etablissement", "TEXT"),
+        ("type", "TEXT"),
+        ("statut", "TEXT"),
+        ("PRIMARY KEY", "((id_region), id)")
+    )
+
+    creer_table(session, bd, "enseignants_par_etablissement",
+        ("id_etablissement", "UUID"),
+        ("id", "INT"),
+        ("nom_enseignant", "TEXT"),
+        ("domaine", "TEXT"),
+        ("email", "TEXT"),
+        ("sexe", "TEXT"),
+        ("PRIMARY KEY", "((id_etablissement), id)")
+    )
+
+    creer_table(session, bd, "eleves_par_etablissement",
+        ("id_etablissement", "UUID"),
+        ("id", "INT"),
+        ("nom_eleve", "TEXT"),
+        ("prenom_eleve", "TEXT"),
+        ("date_naissance", "DATE"),
+        ("sexe", "TEXT"),
+        ("redouble", "BOOLEAN"),
+        ("adresse", "TEXT"),
+        ("PRIMARY KEY", "((id_etablissement), id)")
+    )
+
+    creer_table(session, bd, "cours_par_enseignant",
+        ("id_enseignant", "UUID"),
+        ("id", "INT"),
+        ("niveau", "TEXT"),
+        ("duree", "INT"),
+        ("id_matiere", "UUID"),
+        ("PRIMARY KEY", "((id_enseignant), id)")
+    )
+
+    creer_table(session, bd, "notes_par_eleve",
+        ("id_eleve", "UUID"),
+        ("id", "INT"),
+        ("note", "DECIMAL"),
+        ("type_note", "TEXT"),
+        ("id_matiere", "UUID"),
+        ("PRIMARY KEY", "((id_eleve), id)")
+    )
+
+    # Présences d'un élève triées par date
+    creer_table(session, bd, "presences_par_eleve",
+        ("id_eleve", "UUID"),
+        ("date_presence", "DATE"),
+        ("id", "INT"),
+        ("is_present", "BOOLEAN"),
+        ("id_cours", "UUID"),
+        ("PRIMARY KEY", "((id_eleve), date_presence, id)")
+    )
+
+    creer_table(session, bd, "enseignements_par_enseignant",
+        ("id_enseignant", "UUID"),
+        ("id", "INT"),
+        ("annee", "TEXT"),
+        ("id_matiere", "UUID"),
+        ("PRIMARY KEY", "((id_enseignant), id)")
+    )
+
+def remplir_tables_requetes(session, bd):
+    """Alimente les tables de requête à partir des données déjà présentes dans les tables de base"""
+    d = depot(session, bd)
+    for table in TABLES_REQUETES:
+        colonnes = COLONNES_INSERTION[table]
+        rows = session.execute(f"SELECT {', '.join(colonnes)} FROM {bd}.{table}")
+        lot = []
+        for row in rows:
+            lot.append(tuple(row))
+            if len(lot) >= 5000:
+                d.insert_many(table, lot, tables_requetes_seules=True)
+                lot = []
+        d.insert_many(table, lot, tables_requetes_seules=True)
+
+# ===============================
+# DÉPÔT : REQUÊTES PRÉPARÉES ET INSERTIONS EN MASSE
+# ===============================
+
+# Colonnes insérées par table (ordre des valeurs pour insert_many avec des tuples)
+COLONNES_INSERTION = {
+    "region": ("id", "nom_region", "nom_ville"),
+    "etablissement": ("id", "nom_etablissement", "type", "statut", "id_region"),
+    "enseignant": ("id", "nom_enseignant", "domaine", "email", "sexe", "id_etablissement"),
+    "eleve": ("id", "nom_eleve", "prenom_eleve", "date_naissance", "sexe", "redouble", "adresse", "id_etablissement"),
+    "matiere": ("id", "nom_matiere"),
+    "cours": ("id", "niveau", "duree", "id_matiere", "id_enseignant"),
+    "noter": ("id", "note", "type_note", "id_eleve", "id_matiere"),
+    "presence": ("id", "is_present", "date_presence", "id_eleve", "id_cours"),
+    "enseignement": ("id", "annee", "id_enseignant", "id_matiere"),
+}
+
+class DepotCassandra:
+    """
+    Accès aux tables d'un keyspace lié à une session : chaque requête est préparée
+    une seule fois (cache de PreparedStatement) et les tables sont qualifiées par le
+    keyspace, sans set_keyspace à chaque appel.
+    """
+
+    def __init__(self, session, bd, concurrence=50):
+        self.session = session
+        self.bd = bd
+        self.concurrence = concurrence
+        self._preparees = {}
+
+    def preparer(self, requete):
+        """Retourne le PreparedStatement de `requete`, préparé au premier appel."""
+        prepared = self._preparees.get(requete)
+        if prepared is None:
+            prepared = self.session.prepare(requete)
+            self._preparees[requete] = prepared
+        return prepared
+
+    def requete_insertion(self, table, colonnes=None):
+        colonnes = colonnes or COLONNES_INSERTION[table]
+        placeholders = ", ".join(["?"] * len(colonnes))
+        return self.preparer(f"INSERT INTO {self.bd}.{table} ({', '.join(colonnes)}) VALUES ({placeholders})")
+
+    def _ecritures(self, table, colonnes, valeurs, tables_requetes_seules=False):
+        """Paires (statement, valeurs) pour la table de base et ses tables de requête."""
+        ecritures = [] if tables_requetes_seules else [(self.requete_insertion(table, colonnes), valeurs)]
+        for table_requete, cle_primaire in TABLES_REQUETES.get(table, []):
+            # Cassandra refuse une clé primaire incomplète (clé étrangère ou colonne de
+            # clustering nulle) : la ligne n'a pas sa place dans cette table de requête
+            if all(col in colonnes and valeurs[colonnes.index(col)] is not None for col in cle_primaire):
+                ecritures.append((self.requete_insertion(table_requete, colonnes), valeurs))
+        return ecritures
+
+    def insert(self, table, valeurs):
+        """Insère une ligne (dict colonne -> valeur) et la répercute dans les tables de requête."""
+        colonnes = tuple(valeurs)
+        ecritures = self._ecritures(table, colonnes, tuple(valeurs.values()))
+        if len(ecritures) == 1:
+            self.session.execute(*ecritures[0])
+            return
+        # Batch LOGGED : la table de base et ses copies restent synchronisées
+        batch = BatchStatement(batch_type=BatchType.LOGGED)
+        for prepared, params in ecritures:
+            batch.add(prepared, params)
+        self.session.execute(batch)
+
+    def insert_many(self, table, lignes, colonnes=None, concurrence=None, tables_requetes_seules=False):
+        """
+        Insère plusieurs lignes en parallèle (execute_concurrent), tables de requête comprises.
+        `lignes` : tuples dans l'ordre de `colonnes` (COLONNES_INSERTION par défaut) ou dicts.
+        Retourne le nombre de lignes insérées.
+        """
+        lignes = list(lignes)
+        if not lignes:
+            return 0
+        if isinstance(lignes[0], dict):
+            colonnes = colonnes or tuple(lignes[0])
+            lignes = [tuple(ligne[col] for col in colonnes) for ligne in lignes]
+        colonnes = tuple(colonnes or COLONNES_INSERTION[table])
+        ecritures = [ecriture for valeurs in lignes
+                     for ecriture in self._ecritures(table, colonnes, valeurs, tables_requetes_seules)]
+        execute_concurrent(self.session, ecritures, concurrency=concurrence or self.concurrence)
+        return len(lignes)
+
+# Un dépôt par (session, keyspace), réutilisé par les fonctions inserer_*
+_DEPOTS = weakref.WeakKeyDictionary()
+
+def depot(session, bd):
+    depots_session = _DEPOTS.setdefault(session, {})
+    if bd not in depots_session:
+        depots_session[bd] = DepotCassandra(session, bd)
+    return depots_session[bd]
+
 # ===============================
 # FONCTIONS D'INSERTION AVEC RELATIONS
 # ===============================
 
 def inserer_region(session, bd, region_id, nom_region, nom_ville):
     """Insère une région dans la table region"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO region (id, nom_region, nom_ville)
-        VALUES (%s, %s, %s)
-    """, (region_id, nom_region, nom_ville))
+    depot(session, bd).insert("region", {
+        "id": region_id, "nom_region": nom_region, "nom_ville": nom_ville
+    })
     
     return region_id
 
 def inserer_etablissement(session, bd, etablissement_id, nom_etablissement, type_etab, statut, id_region):
     """Insère un établissement dans la table etablissement"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO etablissement (id, nom_etablissement, type, statut, id_region)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (etablissement_id, nom_etablissement, type_etab, statut, id_region))
+    depot(session, bd).insert("etablissement", {
+        "id": etablissement_id, "nom_etablissement": nom_etablissement, "type": type_etab,
+        "statut": statut, "id_region": id_region
+    })
     
     return etablissement_id
 
 def inserer_enseignant(session, bd, enseignant_id, nom_enseignant, domaine, email, sexe, id_etablissement):
     """Insère un enseignant dans la table enseignant"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO enseignant (id, nom_enseignant, domaine, email, sexe, id_etablissement)
-        VALUES (%s, %s, %s, %s, %s, %s)
-    """, (enseignant_id, nom_enseignant, domaine, email, sexe, id_etablissement))
+    depot(session, bd).insert("enseignant", {
+        "id": enseignant_id, "nom_enseignant": nom_enseignant, "domaine": domaine, "email": email,
+        "sexe": sexe, "id_etablissement": id_etablissement
+    })
     
     return enseignant_id
 
 def inserer_eleve(session, bd, eleve_id, nom_eleve, prenom_eleve, date_naissance, sexe, redouble, adresse, id_etablissement):
     """Insère un élève dans la table eleve"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO eleve (id, nom_eleve, prenom_eleve, date_naissance, sexe, redouble, adresse, id_etablissement)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """, (eleve_id, nom_eleve, prenom_eleve, date_naissance, sexe, redouble, adresse, id_etablissement))
+    depot(session, bd).insert("eleve", {
+        "id": eleve_id, "nom_eleve": nom_eleve, "prenom_eleve": prenom_eleve, "date_naissance": date_naissance,
+        "sexe": sexe, "redouble": redouble, "adresse": adresse, "id_etablissement": id_etablissement
+    })
     
     return eleve_id
 
 def inserer_matiere(session, bd, matiere_id, nom_matiere):
     """Insère une matière dans la table matiere"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO matiere (id, nom_matiere)
-        VALUES (%s, %s)
-    """, (matiere_id, nom_matiere))
+    depot(session, bd).insert("matiere", {
+        "id": matiere_id, "nom_matiere": nom_matiere
+    })
     
     return matiere_id
 
 def inserer_cours(session, bd, cours_id, niveau, duree, id_matiere, id_enseignant):
     """Insère un cours dans la table cours"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO cours (id, niveau, duree, id_matiere, id_enseignant)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (cours_id, niveau, duree, id_matiere, id_enseignant))
+    depot(session, bd).insert("cours", {
+        "id": cours_id, "niveau": niveau, "duree": duree, "id_matiere": id_matiere, "id_enseignant": id_enseignant
+    })
     
     return cours_id
 
 def inserer_noter(session, bd, noter_id, note, type_note, id_eleve, id_matiere):
     """Insère une note dans la table noter"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO noter (id, note, type_note, id_eleve, id_matiere)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (noter_id, note, type_note, id_eleve, id_matiere))
+    depot(session, bd).insert("noter", {
+        "id": noter_id, "note": note, "type_note": type_note, "id_eleve": id_eleve, "id_matiere": id_matiere
+    })
     
     return noter_id
 
 def inserer_presence(session, bd, presence_id, is_present, date_presence, id_eleve, id_cours):
     """Insère une présence dans la table presence"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO presence (id, is_present, date_presence, id_eleve, id_cours)
-        VALUES (%s, %s, %s, %s, %s)
-    """, (presence_id, is_present, date_presence, id_eleve, id_cours))
+    depot(session, bd).insert("presence", {
+        "id": presence_id, "is_present": is_present, "date_presence": date_presence,
+        "id_eleve": id_eleve, "id_cours": id_cours
+    })
     
     return presence_id
 
 def inserer_enseignement(session, bd, enseignement_id, annee, id_enseignant, id_matiere):
     """Insère un enseignement dans la table enseignement"""
-    session.set_keyspace(bd)
-    
-    
-    session.execute("""
-        INSERT INTO enseignement (id, annee, id_enseignant, id_matiere)
-        VALUES (%s, %s, %s, %s)
-    """, (enseignement_id, annee, id_enseignant, id_matiere))
+    depot(session, bd).insert("enseignement", {
+        "id": enseignement_id, "annee": annee, "id_enseignant": id_enseignant, "id_matiere": id_matiere
+    })
     
     return enseignement_id
 
@@ -369,12 +540,12 @@ def extraire_etablissement_par_id(session, bd, etablissement_id):
     return None
 
 def extraire_etablissements_par_region(session, bd, region_id):
-    """Extrait tous les établissements d'une région (nécessite un index)"""
+    """Extrait tous les établissements d'une région (table etablissements_par_region)"""
     session.set_keyspace(bd)
     
-    # Note: Cette requête nécessite un index sur id_region
     try:
-        rows = session.execute("SELECT * FROM etablissement WHERE id_region = %s ALLOW FILTERING", (region_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.etablissements_par_region WHERE id_region = ?"), (region_id,))
         etablissements = []
         for row in rows:
             etablissements.append({
@@ -386,7 +557,7 @@ def extraire_etablissements_par_region(session, bd, region_id):
             })
         return etablissements
     except Exception as e:
-        print(f"Erreur: {e}. Créez un index sur id_region si nécessaire.")
+        print(f"Erreur: {e}")
         return []
 
 def extraire_tous_enseignants(session, bd):
@@ -427,7 +598,8 @@ def extraire_enseignants_par_etablissement(session, bd, etablissement_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM enseignant WHERE id_etablissement = %s ALLOW FILTERING", (etablissement_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.enseignants_par_etablissement WHERE id_etablissement = ?"), (etablissement_id,))
         enseignants = []
         for row in rows:
             enseignants.append({
@@ -485,7 +657,8 @@ def extraire_eleves_par_etablissement(session, bd, etablissement_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM eleve WHERE id_etablissement = %s ALLOW FILTERING", (etablissement_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.eleves_par_etablissement WHERE id_etablissement = ?"), (etablissement_id,))
         eleves = []
         for row in rows:
             eleves.append({
@@ -564,7 +737,8 @@ def extraire_cours_par_enseignant(session, bd, enseignant_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM cours WHERE id_enseignant = %s ALLOW FILTERING", (enseignant_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.cours_par_enseignant WHERE id_enseignant = ?"), (enseignant_id,))
         cours = []
         for row in rows:
             cours.append({
@@ -615,7 +789,8 @@ def extraire_notes_par_eleve(session, bd, eleve_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM noter WHERE id_eleve = %s ALLOW FILTERING", (eleve_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.notes_par_eleve WHERE id_eleve = ?"), (eleve_id,))
         notes = []
         for row in rows:
             notes.append({
@@ -666,7 +841,8 @@ def extraire_presences_par_eleve(session, bd, eleve_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM presence WHERE id_eleve = %s ALLOW FILTERING", (eleve_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.presences_par_eleve WHERE id_eleve = ?"), (eleve_id,))
         presences = []
         for row in rows:
             presences.append({
@@ -715,7 +891,8 @@ def extraire_enseignements_par_enseignant(session, bd, enseignant_id):
     session.set_keyspace(bd)
     
     try:
-        rows = session.execute("SELECT * FROM enseignement WHERE id_enseignant = %s ALLOW FILTERING", (enseignant_id,))
+        # Lecture d'une seule partition de la table de requête
+        rows = session.execute(depot(session, bd).preparer(f"SELECT * FROM {bd}.enseignements_par_enseignant WHERE id_enseignant = ?"), (enseignant_id,))
         enseignements = []
         for row in rows:
             enseignements.append({
@@ -729,6 +906,241 @@ def extraire_enseignements_par_enseignant(session, bd, enseignant_id):
         print(f"Erreur: {e}")
         return []
 
+# ===============================
+# REPRÉSENTATIONS COMPACTES DES LIGNES
+# ===============================
+# Un dict par ligne répète les noms de colonnes et coûte plusieurs centaines d'octets.
+# Deux formes plus compactes, générées à partir de COLONNES_INSERTION, gardent l'accès ligne['colonne'] :
+# - "slots" : une instance de classe à __slots__ par ligne
+# - "colonnes" : une TableColonnes (tableaux typés, texte encodé par dictionnaire)
+
+class Enregistrement:
+    """Base des lignes à __slots__ : accès par ligne['colonne'] comme un dict, ou ligne.colonne"""
+    __slots__ = ()
+
+    def __init__(self, *valeurs):
+        for nom, valeur in zip(self.__slots__, valeurs):
+            setattr(self, nom, valeur)
+
+    def __getitem__(self, nom):
+        try:
+            return getattr(self, nom)
+        except AttributeError:
+            raise KeyError(nom) from None
+
+    def get(self, nom, defaut=None):
+        return getattr(self, nom, defaut)
+
+    def keys(self):
+        return self.__slots__
+
+    def items(self):
+        return [(nom, getattr(self, nom)) for nom in self.__slots__]
+
+    def _asdict(self):
+        return dict(self.items())
+
+    def __eq__(self, autre):
+        if isinstance(autre, (Enregistrement, dict)):
+            return self._asdict() == dict(autre.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._asdict()})"
+
+_CLASSES_ENREGISTREMENT = {}
+
+def classe_enregistrement(table):
+    """Classe à __slots__ pour les colonnes de `table` (créée une fois par table)"""
+    if table not in _CLASSES_ENREGISTREMENT:
+        _CLASSES_ENREGISTREMENT[table] = type(f"Ligne_{table}", (Enregistrement,),
+                                              {"__slots__": COLONNES_INSERTION[table]})
+    return _CLASSES_ENREGISTREMENT[table]
+
+class _ColonneTableau:
+    """Valeurs d'un même type scalaire dans un array (8 octets par valeur au plus)"""
+    def __init__(self, type_, code):
+        self.type_ = type_
+        self.valeurs = array(code)
+
+    def accepte(self, valeur):
+        return type(valeur) is self.type_
+
+    def append(self, valeur):
+        self.valeurs.append(valeur)
+
+    def __getitem__(self, i):
+        return self.type_(self.valeurs[i])
+
+    def __iter__(self):
+        return map(self.type_, self.valeurs)
+
+class _ColonneDictionnaire:
+    """Texte encodé par dictionnaire : chaque valeur distincte stockée une fois, un code par ligne"""
+    def __init__(self):
+        self.codes = array("I")
+        self.dictionnaire = []
+        self._index = {}
+
+    def accepte(self, valeur):
+        return valeur is None or isinstance(valeur, str)
+
+    def append(self, valeur):
+        code = self._index.get(valeur)
+        if code is None:
+            code = self._index[valeur] = len(self.dictionnaire)
+            self.dictionnaire.append(valeur)
+        self.codes.append(code)
+
+    def __getitem__(self, i):
+        return self.dictionnaire[self.codes[i]]
+
+    def __iter__(self):
+        return map(self.dictionnaire.__getitem__, self.codes)
+
+class _ColonneListe(list):
+    """Repli pour les autres valeurs (UUID, Decimal, dates, None dans une colonne numérique)"""
+    def accepte(self, valeur):
+        return True
+
+def _nouvelle_colonne(valeur):
+    for type_, code in ((bool, "b"), (int, "q"), (float, "d")):
+        if type(valeur) is type_:
+            return _ColonneTableau(type_, code)
+    if isinstance(valeur, str):
+        return _ColonneDictionnaire()
+    return _ColonneListe()
+
+class TableColonnes:
+    """
+    Lignes d'une table stockées par colonne. Le type de chaque colonne est choisi
+    d'après sa première valeur ; une colonne repasse en liste si une valeur ne convient pas.
+    table[i] renvoie une ligne à __slots__, table.colonne('sexe') les valeurs d'une colonne.
+    """
+
+    def __init__(self, table, lignes=()):
+        self.table = table
+        self.colonnes = COLONNES_INSERTION[table]
+        self._classe = classe_enregistrement(table)
+        self._donnees = None
+        self._taille = 0
+        self.etendre(lignes)
+
+    def etendre(self, lignes):
+        """Ajoute des lignes (tuples dans l'ordre de self.colonnes)"""
+        for ligne in lignes:
+            if self._donnees is None:
+                self._donnees = [_nouvelle_colonne(valeur) for valeur in ligne]
+            for i, valeur in enumerate(ligne):
+                colonne = self._donnees[i]
+                if not colonne.accepte(valeur):
+                    colonne = self._donnees[i] = _ColonneListe(colonne)
+                colonne.append(valeur)
+            self._taille += 1
+
+    def colonne(self, nom):
+        if self._donnees is None:
+            return []
+        return list(self._donnees[self.colonnes.index(nom)])
+
+    def __len__(self):
+        return self._taille
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._taille))]
+        if i < 0:
+            i += self._taille
+        if not 0 <= i < self._taille:
+            raise IndexError(i)
+        return self._classe(*(colonne[i] for colonne in self._donnees))
+
+    def __iter__(self):
+        if self._donnees is None:
+            return iter(())
+        return map(self._classe, *self._donnees)
+
+def _convertir_lignes(table, rows, forme="dict"):
+    """Lignes du driver -> dicts, lignes à __slots__ ("slots") ou TableColonnes ("colonnes")"""
+    if forme == "dict":
+        colonnes = COLONNES_INSERTION[table]
+        return [dict(zip(colonnes, row)) for row in rows]
+    if forme == "slots":
+        classe = classe_enregistrement(table)
+        return [classe(*row) for row in rows]
+    if forme == "colonnes":
+        return TableColonnes(table, rows)
+    raise ValueError(f"forme inconnue : {forme!r} (dict, slots ou colonnes)")
+
+# ===============================
+# EXTRACTION EN STREAMING (PAGE PAR PAGE, AVEC REPRISE)
+# ===============================
+# Variantes paresseuses des extraire_tous_* : mémoire constante quelle que soit la taille
+# de la table. Les lignes sont les mêmes dicts que ceux des extraire_tous_*.
+
+# Clé de extraire_toutes_donnees_systeme -> table Cassandra
+TABLES_EXTRACTION = {
+    'regions': 'region',
+    'etablissements': 'etablissement',
+    'enseignants': 'enseignant',
+    'eleves': 'eleve',
+    'matieres': 'matiere',
+    'cours': 'cours',
+    'notes': 'noter',
+    'presences': 'presence',
+    'enseignements': 'enseignement',
+}
+
+def iterer_pages(session, bd, table, fetch_size=5000, paging_state=None, forme="dict"):
+    """
+    Parcourt une table page par page
+    
+    Args:
+        fetch_size: Nombre de lignes par page
+        paging_state: Jeton de reprise obtenu lors d'un parcours précédent (None = depuis le début)
+        forme: "dict", "slots" ou "colonnes" (voir _convertir_lignes)
+    
+    Yields:
+        tuple: (lignes de la page, jeton de la page suivante ou None à la fin).
+        Sauvegarder le jeton une fois la page traitée permet de reprendre après une panne.
+    """
+    colonnes = COLONNES_INSERTION[table]
+    statement = SimpleStatement(f"SELECT {', '.join(colonnes)} FROM {bd}.{table}", fetch_size=fetch_size)
+    while True:
+        # current_rows : uniquement la page reçue, sans déclencher la lecture des suivantes
+        resultat = session.execute(statement, paging_state=paging_state)
+        paging_state = resultat.paging_state
+        yield _convertir_lignes(table, resultat.current_rows, forme), paging_state
+        if paging_state is None:
+            return
+
+def iterer_lots(session, bd, table, taille_lot=5000, paging_state=None, forme="dict"):
+    """Lots de `taille_lot` lignes au plus (une page par lot)"""
+    for lignes, _ in iterer_pages(session, bd, table, taille_lot, paging_state, forme):
+        if len(lignes):
+            yield lignes
+
+def iterer_table(session, bd, table, fetch_size=5000, paging_state=None, forme="dict"):
+    """Lignes d'une table une à une"""
+    for lignes, _ in iterer_pages(session, bd, table, fetch_size, paging_state, forme):
+        yield from lignes
+
+def iterer_toutes_donnees_systeme(session, bd, taille_lot=5000, forme="dict"):
+    """Équivalent streaming de extraire_toutes_donnees_systeme : génère (nom_table, lot)"""
+    for nom_table, table in TABLES_EXTRACTION.items():
+        for lot in iterer_lots(session, bd, table, taille_lot, forme=forme):
+            yield nom_table, lot
+
+def extraire_table(session, bd, table, forme="dict", fetch_size=5000):
+    """Toute une table sous la forme demandée (liste de lignes, ou une seule TableColonnes)"""
+    if forme == "colonnes":
+        resultat = TableColonnes(table)
+        statement = SimpleStatement(f"SELECT {', '.join(resultat.colonnes)} FROM {bd}.{table}",
+                                    fetch_size=fetch_size)
+        resultat.etendre(session.execute(statement))
+        return resultat
+    return list(iterer_table(session, bd, table, fetch_size, forme=forme))
+
 # ===============================
 # FONCTION D'EXEMPLE POUR TESTER LES EXTRACTIONS
 # ===============================
@@ -826,7 +1238,7 @@ def exemple_extractions():
     # Retourner toutes les données extraites
     return donnees_extraites
 
-def extraire_toutes_donnees_systeme(session, bd, affichage=True):
+def extraire_toutes_donnees_systeme(session, bd, affichage=True, forme="dict"):
     """
     Fonction complète pour extraire toutes les données du système
     
@@ -834,6 +1246,7 @@ def extraire_toutes_donnees_systeme(session, bd, affichage=True):
         session: Session Cassandra
         bd: Nom de la base de données
         affichage: Boolean - Afficher les résultats ou non
+        forme: "dict", "slots" ou "colonnes" (lignes compactes, même accès ligne['colonne'])
     
     Returns:
         dict: Dictionnaire contenant toutes les données extraites
@@ -860,7 +1273,10 @@ def extraire_toutes_donnees_systeme(session, bd, affichage=True):
     
     for nom_table, fonction_extraction in tables_et_fonctions:
         try:
-            donnees = fonction_extraction(session, bd)
+            if forme == "dict":
+                donnees = fonction_extraction(session, bd)
+            else:
+                donnees = extraire_table(session, bd, TABLES_EXTRACTION[nom_table], forme)
             donnees_completes[nom_table] = donnees
             
             if affichage:
@@ -877,10 +1293,66 @@ def extraire_toutes_donnees_systeme(session, bd, affichage=True):
     
     return donnees_completes
 
-def extraire_donnees_avec_relations(session, bd, affichage=True):
+# ===============================
+# ANALYSE DES RELATIONS EN UN PASSAGE
+# ===============================
+# Hash join : chaque table enfant est lue une seule fois (colonne de clé étrangère uniquement)
+# et comptée dans un Counter, puis jointe à l'index id -> libellé de la table parente.
+# Aucune table n'est gardée entière en mémoire.
+
+# relation -> (table enfant, clé étrangère, table parente, colonne libellé)
+RELATIONS = {
+    'etablissements_par_region': ('etablissement', 'id_region', 'region', 'nom_region'),
+    'eleves_par_etablissement': ('eleve', 'id_etablissement', 'etablissement', 'nom_etablissement'),
+    'enseignants_par_etablissement': ('enseignant', 'id_etablissement', 'etablissement', 'nom_etablissement'),
+}
+
+def compter_par_cle(session, bd, table, cle, fetch_size=5000):
+    """Nombre de lignes de `table` par valeur de `cle`, en streaming page par page"""
+    statement = SimpleStatement(f"SELECT {cle} FROM {bd}.{table}", fetch_size=fetch_size)
+    return Counter(row[0] for row in session.execute(statement))
+
+def index_libelles(session, bd, table, colonne, fetch_size=5000):
+    """Index id -> `colonne` d'une table parente"""
+    statement = SimpleStatement(f"SELECT id, {colonne} FROM {bd}.{table}", fetch_size=fetch_size)
+    return {row[0]: row[1] for row in session.execute(statement)}
+
+def compter_relations(session, bd, relations=RELATIONS, top=None, fetch_size=5000):
+    """
+    Effectifs de chaque relation clé étrangère -> parent
+    
+    Args:
+        relations: dict relation -> (table enfant, clé étrangère, table parente, colonne libellé)
+        top: ne garder que les `top` groupes les plus nombreux (None = tous)
+    
+    Returns:
+        dict: {relation: {libellé du parent: effectif}}, trié par effectif décroissant
+    """
+    index = {}
+    resultats = {}
+    for relation, (enfant, cle, parent, libelle) in relations.items():
+        # Un seul parcours par table parente, même si plusieurs relations y pointent
+        if (parent, libelle) not in index:
+            index[(parent, libelle)] = index_libelles(session, bd, parent, libelle, fetch_size)
+        libelles = index[(parent, libelle)]
+        comptes = compter_par_cle(session, bd, enfant, cle, fetch_size)
+        if not libelles or not comptes:
+            continue
+        
+        # Les parents de même libellé sont cumulés, ceux sans enfant comptent 0
+        groupes = Counter({nom: 0 for nom in libelles.values()})
+        for id_parent, nom in libelles.items():
+            groupes[nom] += comptes.get(id_parent, 0)
+        resultats[relation] = dict(groupes.most_common(top))
+    return resultats
+
+def extraire_donnees_avec_relations(session, bd, affichage=True, inclure_donnees=False):
     """
     Extrait les données en montrant les relations entre les entités
     
+    Args:
+        inclure_donnees: Boolean - Joindre aussi toutes les tables (extraire_toutes_donnees_systeme)
+    
     Returns:
         dict: Données avec informations relationnelles
     """
@@ -889,32 +1361,11 @@ def extraire_donnees_avec_relations(session, bd, affichage=True):
     if affichage:
         print("=== EXTRACTION AVEC RELATIONS ===\n")
     
-    # Extraire les données de base
-    donnees = extraire_toutes_donnees_systeme(session, bd, affichage=False)
+    # Les comptages ne nécessitent plus de charger les tables
+    donnees = extraire_toutes_donnees_systeme(session, bd, affichage=False) if inclure_donnees else {}
     
     # Analyser les relations
-    relations_trouvees = {}
-    
-    # Analyser établissements par région
-    if donnees['regions'] and donnees['etablissements']:
-        relations_trouvees['etablissements_par_region'] = {}
-        for region in donnees['regions']:
-            etabs_region = [e for e in donnees['etablissements'] if e['id_region'] == region['id']]
-            relations_trouvees['etablissements_par_region'][region['nom_region']] = len(etabs_region)
-    
-    # Analyser élèves par établissement
-    if donnees['etablissements'] and donnees['eleves']:
-        relations_trouvees['eleves_par_etablissement'] = {}
-        for etab in donnees['etablissements']:
-            eleves_etab = [e for e in donnees['eleves'] if e['id_etablissement'] == etab['id']]
-            relations_trouvees['eleves_par_etablissement'][etab['nom_etablissement']] = len(eleves_etab)
-    
-    # Analyser enseignants par établissement
-    if donnees['etablissements'] and donnees['enseignants']:
-        relations_trouvees['enseignants_par_etablissement'] = {}
-        for etab in donnees['etablissements']:
-            ens_etab = [e for e in donnees['enseignants'] if e['id_etablissement'] == etab['id']]
-            relations_trouvees['enseignants_par_etablissement'][etab['nom_etablissement']] = len(ens_etab)
+    relations_trouvees = compter_relations(session, bd)
     
     if affichage:
         print("🔗 ANALYSE DES RELATIONS:")
@@ -925,8 +1376,7 @@ def extraire_donnees_avec_relations(session, bd, affichage=True):
         
         if 'eleves_par_etablissement' in relations_trouvees:
             print("\n👨‍🎓 Élèves par établissement (top 3):")
-            top_eleves = sorted(relations_trouvees['eleves_par_etablissement'].items(), 
-                              key=lambda x: x[1], reverse=True)[:3]
+            top_eleves = list(relations_trouvees['eleves_par_etablissement'].items())[:3]
             for etab, count in top_eleves:
                 print(f"   - {etab}: {count} élèves")
     
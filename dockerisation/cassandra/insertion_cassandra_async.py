@@ -0,0 +1,185 @@
+import asyncio
+import weakref
+from cassandra.cluster import Cluster
+
+from insertion_cassandra import COLONNES_INSERTION, TABLES_EXTRACTION, _convertir_lignes, depot
+
+# ===============================
+# FAÇADE ASYNCIO DES FONCTIONS D'EXTRACTION
+# ===============================
+# Mêmes noms que dans insertion_cassandra, en coroutines : un script passe en asynchrone avec
+#     import insertion_cassandra_async as ic
+#     eleves = await asyncio.gather(*(ic.extraire_eleve_par_id(session, bd, i) for i in ids))
+# Les requêtes partent via execute_async ; un sémaphore par session borne le nombre en vol.
+
+CONCURRENCE_PAR_DEFAUT = 100
+
+# Limite choisie par session, et sémaphores par boucle asyncio puis par session :
+# un asyncio.Semaphore est lié à la boucle qui l'utilise, une session partagée entre
+# plusieurs asyncio.run (ou plusieurs threads ayant chacun sa boucle) en a donc un par boucle
+_CONCURRENCES = weakref.WeakKeyDictionary()
+_SEMAPHORES = weakref.WeakKeyDictionary()
+
+def configurer(session, concurrence=CONCURRENCE_PAR_DEFAUT):
+    """Fixe le nombre maximal de requêtes en vol pour `session` (dans chaque boucle asyncio)"""
+    _CONCURRENCES[session] = concurrence
+
+def _semaphore(session):
+    concurrence = _CONCURRENCES.get(session, CONCURRENCE_PAR_DEFAUT)
+    par_session = _SEMAPHORES.setdefault(asyncio.get_running_loop(), weakref.WeakKeyDictionary())
+    limite, semaphore = par_session.get(session, (None, None))
+    # Nouveau sémaphore à la première requête dans cette boucle ou après un configurer()
+    if limite != concurrence:
+        semaphore = asyncio.Semaphore(concurrence)
+        par_session[session] = (concurrence, semaphore)
+    return semaphore
+
+def _resoudre(future, resultat=None, erreur=None):
+    if future.done():  # coroutine annulée entre-temps
+        return
+    if erreur is not None:
+        future.set_exception(erreur)
+    else:
+        future.set_result(resultat)
+
+async def executer(session, requete, params=None):
+    """
+    Équivalent awaitable de session.execute : toutes les pages sont lues
+    (start_fetching_next_page) et la liste des lignes est retournée.
+    Les callbacks du driver tournent dans ses threads, d'où call_soon_threadsafe.
+    """
+    async with _semaphore(session):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        lignes = []
+        response_future = session.execute_async(requete, params)
+
+        def page(rows):
+            lignes.extend(rows)
+            if response_future.has_more_pages:
+                response_future.start_fetching_next_page()
+            else:
+                loop.call_soon_threadsafe(_resoudre, future, lignes)
+
+        def echec(exc):
+            loop.call_soon_threadsafe(_resoudre, future, None, exc)
+
+        response_future.add_callbacks(page, echec)
+        return await future
+
+def _select(bd, table, colonnes, cle=None):
+    requete = f"SELECT {', '.join(colonnes)} FROM {bd}.{table}"
+    return requete if cle is None else f"{requete} WHERE {cle} = ?"
+
+# ===============================
+# FABRIQUES DE FONCTIONS D'EXTRACTION
+# ===============================
+
+def _tous(table):
+    async def extraire(session, bd, forme="dict"):
+        rows = await executer(session, _select(bd, table, COLONNES_INSERTION[table]))
+        return _convertir_lignes(table, rows, forme)
+    extraire.__doc__ = f"Extrait toutes les lignes de {table}"
+    return extraire
+
+def _par_id(table):
+    async def extraire(session, bd, id_ligne):
+        prepared = depot(session, bd).preparer(_select(bd, table, COLONNES_INSERTION[table], "id"))
+        rows = await executer(session, prepared, (id_ligne,))
+        return _convertir_lignes(table, rows)[0] if rows else None
+    extraire.__doc__ = f"Extrait une ligne de {table} par son ID"
+    return extraire
+
+def _par_cle(table, table_requete, cle):
+    async def extraire(session, bd, valeur):
+        try:
+            # Lecture d'une seule partition de la table de requête
+            prepared = depot(session, bd).preparer(_select(bd, table_requete, COLONNES_INSERTION[table], cle))
+            rows = await executer(session, prepared, (valeur,))
+            return _convertir_lignes(table, rows)
+        except Exception as e:
+            print(f"Erreur: {e}")
+            return []
+    extraire.__doc__ = f"Extrait les lignes de {table} par {cle} (table {table_requete})"
+    return extraire
+
+extraire_toutes_regions = _tous("region")
+extraire_region_par_id = _par_id("region")
+
+extraire_tous_etablissements = _tous("etablissement")
+extraire_etablissement_par_id = _par_id("etablissement")
+extraire_etablissements_par_region = _par_cle("etablissement", "etablissements_par_region", "id_region")
+
+extraire_tous_enseignants = _tous("enseignant")
+extraire_enseignant_par_id = _par_id("enseignant")
+extraire_enseignants_par_etablissement = _par_cle("enseignant", "enseignants_par_etablissement", "id_etablissement")
+
+extraire_tous_eleves = _tous("eleve")
+extraire_eleve_par_id = _par_id("eleve")
+extraire_eleves_par_etablissement = _par_cle("eleve", "eleves_par_etablissement", "id_etablissement")
+
+extraire_toutes_matieres = _tous("matiere")
+extraire_matiere_par_id = _par_id("matiere")
+
+extraire_tous_cours = _tous("cours")
+extraire_cours_par_id = _par_id("cours")
+extraire_cours_par_enseignant = _par_cle("cours", "cours_par_enseignant", "id_enseignant")
+
+extraire_toutes_notes = _tous("noter")
+extraire_note_par_id = _par_id("noter")
+extraire_notes_par_eleve = _par_cle("noter", "notes_par_eleve", "id_eleve")
+
+extraire_toutes_presences = _tous("presence")
+extraire_presence_par_id = _par_id("presence")
+extraire_presences_par_eleve = _par_cle("presence", "presences_par_eleve", "id_eleve")
+
+extraire_tous_enseignements = _tous("enseignement")
+extraire_enseignement_par_id = _par_id("enseignement")
+extraire_enseignements_par_enseignant = _par_cle("enseignement", "enseignements_par_enseignant", "id_enseignant")
+
+async def extraire_par_ids(fonction, session, bd, ids):
+    """Lance `fonction` (une extraire_*_par_*) pour chaque id en parallèle, résultats dans l'ordre des ids"""
+    return await asyncio.gather(*(fonction(session, bd, i) for i in ids))
+
+async def extraire_toutes_donnees_systeme(session, bd, affichage=True, forme="dict"):
+    """Extrait toutes les tables en parallèle (même résultat que la version synchrone)"""
+    if affichage:
+        print("=== EXTRACTION COMPLÈTE DU SYSTÈME ÉDUCATIF ===\n")
+
+    noms = list(TABLES_EXTRACTION)
+    resultats = await asyncio.gather(
+        *(_tous(TABLES_EXTRACTION[nom])(session, bd, forme) for nom in noms),
+        return_exceptions=True
+    )
+
+    donnees_completes = {}
+    for nom_table, donnees in zip(noms, resultats):
+        if isinstance(donnees, Exception):
+            if affichage:
+                print(f"❌ Erreur lors de l'extraction de {nom_table}: {donnees}")
+            donnees = []
+        elif affichage:
+            print(f"✅ {nom_table.capitalize()}: {len(donnees)} enregistrements extraits")
+        donnees_completes[nom_table] = donnees
+
+    if affichage:
+        total_enregistrements = sum(len(donnees) for donnees in donnees_completes.values())
+        print(f"\n📊 TOTAL: {total_enregistrements} enregistrements extraits de {len(donnees_completes)} tables")
+
+    return donnees_completes
+
+async def main():
+    cluster = Cluster(['127.0.0.1'])
+    session = cluster.connect()
+    bd = "education"
+    configurer(session, concurrence=200)
+
+    donnees = await extraire_toutes_donnees_systeme(session, bd)
+    ids = [eleve['id'] for eleve in donnees['eleves'][:1000]]
+    eleves = await extraire_par_ids(extraire_eleve_par_id, session, bd, ids)
+    print(f"{len(eleves)} élèves relus par id")
+
+    cluster.shutdown()
+
+if __name__ == "__main__":
+    asyncio.run(main())